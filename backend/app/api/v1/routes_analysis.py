@@ -13,7 +13,7 @@ from app.services.reserving_chainladder import run_chain_ladder_from_csv
 from app.services.glm_models import run_glm_analysis
 from app.services.time_series import run_time_series_analysis
 from app.services.mortality_models import compute_mortality_dashboard
-from app.services.nlq_service import process_nlq
+from app.services.nlq_service import process_nlq_async
 
 
 # Redis/RQ setup
@@ -863,7 +863,7 @@ async def generate_report_from_job(request: ReportRequest):
         FileResponse with PDF or Word document
     """
     try:
-        from app.services.report_generator import generate_analysis_report
+        from app.services.report_generator import generate_analysis_report_async
         
         # Get results from job_id or use provided results
         if request.job_id:
@@ -884,7 +884,7 @@ async def generate_report_from_job(request: ReportRequest):
             )
         
         # Generate report
-        report_path = generate_analysis_report(
+        report_path = await generate_analysis_report_async(
             analysis_type=analysis_type,
             results=result,
             dataset_id=dataset_id,
@@ -1059,9 +1059,9 @@ async def generate_mortality_report(dataset_id: str, format: str = "pdf"):
         result = await analyze_mortality_table(mortality_request)
         
         # Generate report directly from results
-        from app.services.report_generator import generate_analysis_report
+        from app.services.report_generator import generate_analysis_report_async
         
-        report_path = generate_analysis_report(
+        report_path = await generate_analysis_report_async(
             analysis_type="mortality",
             results=result,
             dataset_id=dataset_id,
@@ -1158,7 +1158,7 @@ async def process_natural_language_query(request: NLQRequest) -> Dict:
         
         # Process query
         print(f"[INFO] Processing NLQ: '{request.query}' for dataset {request.dataset_id}")
-        result = process_nlq(csv_path, request.query)
+        result = await process_nlq_async(csv_path, request.query)
         
         print(f"[INFO] NLQ processed successfully: {result['chart_type']}")
         return result
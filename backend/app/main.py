@@ -29,6 +29,13 @@ app.include_router(routes_datasets.router)
 app.include_router(routes_analysis.router)
 
 
+@app.on_event("shutdown")
+def shutdown_report_workers():
+    """Stop the report generator's background threads."""
+    from app.services.report_generator import shutdown_report_executor
+    shutdown_report_executor()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
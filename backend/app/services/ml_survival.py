@@ -3,23 +3,29 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
+from functools import lru_cache
+import os
 import warnings
-warnings.filterwarnings('ignore')
 
+# Silence import-time deprecation noise from scikit-survival only
 try:
-    from sksurv.ensemble import RandomSurvivalForest, GradientBoostingSurvivalAnalysis
-    from sksurv.linear_model import CoxnetSurvivalAnalysis, CoxPHSurvivalAnalysis
-    from sksurv.metrics import concordance_index_censored, integrated_brier_score
-    from sksurv.util import Surv
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        from sksurv.ensemble import RandomSurvivalForest, GradientBoostingSurvivalAnalysis
+        from sksurv.linear_model import CoxnetSurvivalAnalysis, CoxPHSurvivalAnalysis
+        from sksurv.metrics import concordance_index_censored, integrated_brier_score
     SKSURV_AVAILABLE = True
 except ImportError:
     SKSURV_AVAILABLE = False
     print("[WARN] scikit-survival not available. ML survival models will not work.")
 
 from lifelines import KaplanMeierFitter, CoxPHFitter
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+from app.utils.csv_loader import load_csv
+
 
 def check_sksurv_available():
     """Check if scikit-survival is available."""
@@ -68,11 +74,73 @@ def prepare_survival_data(
     
     # Create structured array for survival outcome
     # scikit-survival requires structured array with (event, time)
-    y = Surv.from_dataframe(event_col, time_col, df)
+    events = df[event_col].to_numpy()
+    if events.dtype != np.bool_:
+        if not np.isin(events, (0, 1)).all():
+            raise ValueError(f"Event column '{event_col}' must contain only 0/1 values")
+        events = events.astype(np.bool_)
+    
+    y = np.empty(len(df), dtype=[('event', np.bool_), ('time', np.float64)])
+    y['event'] = events
+    y['time'] = df[time_col].to_numpy(dtype=np.float64)
     
     return X, y, valid_features
 
 
+def rank_indices(scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of scores in descending order, optionally limited to the top_k.
+    
+    Uses argpartition so only the selected top_k entries are sorted.
+    """
+    if top_k is None or top_k >= len(scores):
+        return np.argsort(-scores)
+    
+    top = np.argpartition(-scores, top_k)[:top_k]
+    return top[np.argsort(-scores[top])]
+
+
+# (X_train, X_test, y_train, y_test, feature_names)
+SurvivalSplit = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]
+
+
+def split_survival_data(
+    df: pd.DataFrame,
+    time_col: str = 'time',
+    event_col: str = 'event',
+    feature_cols: Optional[List[str]] = None,
+    random_state: int = 42
+) -> SurvivalSplit:
+    """
+    Validate, prepare and split survival data into train/test sets.
+    
+    Args:
+        df: DataFrame with survival data
+        time_col: Time column name
+        event_col: Event column name
+        feature_cols: Feature columns (auto-detect if None)
+        random_state: Random seed for the split
+        
+    Returns:
+        Tuple of (X_train, X_test, y_train, y_test, feature_names)
+    """
+    # Validate required columns
+    if time_col not in df.columns:
+        raise ValueError(f"Time column '{time_col}' not found")
+    if event_col not in df.columns:
+        raise ValueError(f"Event column '{event_col}' not found")
+    
+    # Prepare data
+    X, y, feature_names = prepare_survival_data(df, time_col, event_col, feature_cols)
+    
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=random_state
+    )
+    
+    return X_train, X_test, y_train, y_test, feature_names
+
+
 def train_random_survival_forest(
     csv_path: str,
     time_col: str = 'time',
@@ -82,7 +150,9 @@ def train_random_survival_forest(
     max_depth: Optional[int] = None,
     min_samples_split: int = 10,
     min_samples_leaf: int = 6,
-    random_state: int = 42
+    random_state: int = 42,
+    split_data: Optional[SurvivalSplit] = None,
+    top_k: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Train Random Survival Forest model.
@@ -97,28 +167,21 @@ def train_random_survival_forest(
         min_samples_split: Minimum samples to split
         min_samples_leaf: Minimum samples per leaf
         random_state: Random seed
+        split_data: Precomputed (X_train, X_test, y_train, y_test, feature_names);
+            skips loading and splitting the CSV when given
+        top_k: Only report the top_k most important features (all if None)
         
     Returns:
         Dictionary with model results, variable importance, predictions
     """
     check_sksurv_available()
     
-    # Load data
-    df = pd.read_csv(csv_path)
-    
-    # Validate required columns
-    if time_col not in df.columns:
-        raise ValueError(f"Time column '{time_col}' not found")
-    if event_col not in df.columns:
-        raise ValueError(f"Event column '{event_col}' not found")
-    
-    # Prepare data
-    X, y, feature_names = prepare_survival_data(df, time_col, event_col, feature_cols)
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=random_state
-    )
+    # Load and split data (unless the caller already did)
+    if split_data is None:
+        split_data = split_survival_data(
+            load_csv(csv_path), time_col, event_col, feature_cols, random_state
+        )
+    X_train, X_test, y_train, y_test, feature_names = split_data
     
     # Train Random Survival Forest
     rsf = RandomSurvivalForest(
@@ -130,20 +193,39 @@ def train_random_survival_forest(
         n_jobs=-1
     )
     
+    rsf.fit(X_train, y_train)
+    
+    # Compute concordance index
+    train_c_index = rsf.score(X_train, y_train)
+    test_c_index = rsf.score(X_test, y_test)
+    
+    # Variable importance (RSF has no impurity-based importances, so use
+    # permutation importance on the held-out set)
+    importance = permutation_importance(
+        rsf, X_test, y_test, n_repeats=5, random_state=random_state
+    ).importances_mean
+    order = rank_indices(importance, top_k)
+    variable_importance = [
+        {'feature': feature_names[i], 'importance': float(importance[i])}
+        for i in order
+    ]
+    
+    # Predict survival functions for test set
+    surv_funcs = rsf.predict_survival_function(X_test[:10])
+    
     # Get unique event times
     unique_times = np.unique(y_train['time'])
     
-    # Extract survival probabilities at each time point
-    predictions = []
-    for i, surv_func in enumerate(surv_funcs):
-        surv_probs = [surv_func(t) for t in unique_times]
-        predictions.append({
-            'sample_id': int(i),
-            'timeline': unique_times.tolist(),
-            'survival_prob': surv_probs,
-            'actual_time': float(y_test[i]['time']),
-            'actual_event': bool(y_test[i]['event'])
-        })
+    # Extract survival probabilities at each time point (one row per sample,
+    # columns aligned with unique_times)
+    n_samples = len(surv_funcs)
+    surv_matrix = np.vstack([surv_func(unique_times) for surv_func in surv_funcs])
+    predictions = {
+        'sample_ids': list(range(n_samples)),
+        'survival_prob': surv_matrix.tolist(),
+        'actual_time': y_test['time'][:n_samples].tolist(),
+        'actual_event': y_test['event'][:n_samples].tolist()
+    }
     
     return {
         'model_type': 'random_survival_forest',
@@ -155,7 +237,7 @@ def train_random_survival_forest(
         'n_test': len(X_test),
         'n_features': len(feature_names),
         'feature_names': feature_names,
-        'variable_importance': importance_df.to_dict('records'),
+        'variable_importance': variable_importance,
         'predictions': predictions,
         'unique_times': unique_times.tolist()
     }
@@ -171,7 +253,9 @@ def train_gradient_boosted_survival(
     max_depth: int = 3,
     min_samples_split: int = 10,
     min_samples_leaf: int = 6,
-    random_state: int = 42
+    random_state: int = 42,
+    split_data: Optional[SurvivalSplit] = None,
+    top_k: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Train Gradient Boosted Survival model.
@@ -187,22 +271,21 @@ def train_gradient_boosted_survival(
         min_samples_split: Minimum samples to split
         min_samples_leaf: Minimum samples per leaf
         random_state: Random seed
+        split_data: Precomputed (X_train, X_test, y_train, y_test, feature_names);
+            skips loading and splitting the CSV when given
+        top_k: Only report the top_k most important features (all if None)
         
     Returns:
         Dictionary with model results, variable importance, predictions
     """
     check_sksurv_available()
     
-    # Load data
-    df = pd.read_csv(csv_path)
-    
-    # Prepare data
-    X, y, feature_names = prepare_survival_data(df, time_col, event_col, feature_cols)
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=random_state
-    )
+    # Load and split data (unless the caller already did)
+    if split_data is None:
+        split_data = split_survival_data(
+            load_csv(csv_path), time_col, event_col, feature_cols, random_state
+        )
+    X_train, X_test, y_train, y_test, feature_names = split_data
     
     # Train Gradient Boosted Survival
     gbs = GradientBoostingSurvivalAnalysis(
@@ -222,10 +305,11 @@ def train_gradient_boosted_survival(
     
     # Variable importance
     importance = gbs.feature_importances_
-    importance_df = pd.DataFrame({
-        'feature': feature_names,
-        'importance': importance
-    }).sort_values('importance', ascending=False)
+    order = rank_indices(importance, top_k)
+    variable_importance = [
+        {'feature': feature_names[i], 'importance': float(importance[i])}
+        for i in order
+    ]
     
     # Predict survival functions for test set
     surv_funcs = gbs.predict_survival_function(X_test[:10])
@@ -233,17 +317,16 @@ def train_gradient_boosted_survival(
     # Get unique event times
     unique_times = np.unique(y_train['time'])
     
-    # Extract survival probabilities
-    predictions = []
-    for i, surv_func in enumerate(surv_funcs):
-        surv_probs = [surv_func(t) for t in unique_times]
-        predictions.append({
-            'sample_id': int(i),
-            'timeline': unique_times.tolist(),
-            'survival_prob': surv_probs,
-            'actual_time': float(y_test[i]['time']),
-            'actual_event': bool(y_test[i]['event'])
-        })
+    # Extract survival probabilities at each time point (one row per sample,
+    # columns aligned with unique_times)
+    n_samples = len(surv_funcs)
+    surv_matrix = np.vstack([surv_func(unique_times) for surv_func in surv_funcs])
+    predictions = {
+        'sample_ids': list(range(n_samples)),
+        'survival_prob': surv_matrix.tolist(),
+        'actual_time': y_test['time'][:n_samples].tolist(),
+        'actual_event': y_test['event'][:n_samples].tolist()
+    }
     
     return {
         'model_type': 'gradient_boosted_survival',
@@ -256,7 +339,7 @@ def train_gradient_boosted_survival(
         'n_test': len(X_test),
         'n_features': len(feature_names),
         'feature_names': feature_names,
-        'variable_importance': importance_df.to_dict('records'),
+        'variable_importance': variable_importance,
         'predictions': predictions,
         'unique_times': unique_times.tolist()
     }
@@ -270,7 +353,9 @@ def train_coxnet_model(
     alpha_min_ratio: float = 0.01,
     l1_ratio: float = 0.5,
     n_alphas: int = 100,
-    random_state: int = 42
+    random_state: int = 42,
+    split_data: Optional[SurvivalSplit] = None,
+    top_k: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Train CoxNet (penalized Cox) model with elastic net regularization.
@@ -284,25 +369,26 @@ def train_coxnet_model(
         l1_ratio: Elastic net mixing (0=Ridge, 1=Lasso)
         n_alphas: Number of alphas to try
         random_state: Random seed
+        split_data: Precomputed (X_train, X_test, y_train, y_test, feature_names);
+            skips loading and splitting the CSV when given
+        top_k: Only report the top_k largest coefficients by magnitude (all if None)
         
     Returns:
         Dictionary with model results, coefficients, predictions
     """
     check_sksurv_available()
     
-    # Load data
-    df = pd.read_csv(csv_path)
-    
-    # Prepare data
-    X, y, feature_names = prepare_survival_data(df, time_col, event_col, feature_cols)
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=random_state
-    )
+    # Load and split data (unless the caller already did)
+    shared_split = split_data is not None
+    if not shared_split:
+        split_data = split_survival_data(
+            load_csv(csv_path), time_col, event_col, feature_cols, random_state
+        )
+    X_train, X_test, y_train, y_test, feature_names = split_data
     
-    # Standardize features (important for penalized models)
-    scaler = StandardScaler()
+    # Standardize features (important for penalized models). Scale in place
+    # unless the split arrays are shared with the caller.
+    scaler = StandardScaler(copy=shared_split)
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
@@ -320,16 +406,24 @@ def train_coxnet_model(
     train_c_index = coxnet.score(X_train_scaled, y_train)
     test_c_index = coxnet.score(X_test_scaled, y_test)
     
-    # Get coefficients at optimal alpha
+    # Get coefficients of the fitted path (coef_ is n_features x n_alphas;
+    # the last column is the one used by predict/score)
     coef = coxnet.coef_
-    coef_df = pd.DataFrame({
-        'feature': feature_names,
-        'coefficient': coef,
-        'abs_coefficient': np.abs(coef)
-    }).sort_values('abs_coefficient', ascending=False)
+    if coef.ndim == 2:
+        coef = coef[:, -1]
+    abs_coef = np.abs(coef)
+    order = rank_indices(abs_coef, top_k)
+    coefficients = [
+        {
+            'feature': feature_names[i],
+            'coefficient': float(coef[i]),
+            'abs_coefficient': float(abs_coef[i])
+        }
+        for i in order
+    ]
     
     # Count non-zero coefficients
-    n_nonzero = np.sum(coef != 0)
+    n_nonzero = np.count_nonzero(coef)
     
     # Predict risk scores
     risk_scores_test = coxnet.predict(X_test_scaled)
@@ -347,7 +441,7 @@ def train_coxnet_model(
         'n_features': len(feature_names),
         'n_nonzero_coef': int(n_nonzero),
         'feature_names': feature_names,
-        'coefficients': coef_df.to_dict('records'),
+        'coefficients': coefficients,
         'risk_scores_sample': risk_scores_test[:10].tolist()
     }
 
@@ -376,9 +470,11 @@ def compare_survival_models(
         'best_model': None
     }
     
+    # Load data once; all models below share it
+    df = load_csv(csv_path)
+    
     # Train Kaplan-Meier (baseline)
     try:
-        df = pd.read_csv(csv_path)
         kmf = KaplanMeierFitter()
         kmf.fit(df[time_col], df[event_col])
         
@@ -391,11 +487,12 @@ def compare_survival_models(
     except Exception as e:
         results['models']['kaplan_meier'] = {'error': str(e)}
     
-    # Train Cox PH (baseline parametric)
+    # Train Cox PH (baseline parametric) on the train/test split that is
+    # reused by the ML models
+    split_data = None
     try:
-        df = pd.read_csv(csv_path)
-        X, y, feature_names = prepare_survival_data(df, time_col, event_col, feature_cols)
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        split_data = split_survival_data(df, time_col, event_col, feature_cols)
+        X_train, X_test, y_train, y_test, feature_names = split_data
         
         # Use lifelines Cox for baseline
         cox_df = pd.DataFrame(X_train, columns=feature_names)
@@ -418,7 +515,8 @@ def compare_survival_models(
         # Random Survival Forest
         try:
             rsf_results = train_random_survival_forest(
-                csv_path, time_col, event_col, feature_cols
+                csv_path, time_col, event_col, feature_cols,
+                split_data=split_data
             )
             results['models']['random_survival_forest'] = rsf_results
         except Exception as e:
@@ -427,7 +525,8 @@ def compare_survival_models(
         # Gradient Boosted Survival
         try:
             gbs_results = train_gradient_boosted_survival(
-                csv_path, time_col, event_col, feature_cols
+                csv_path, time_col, event_col, feature_cols,
+                split_data=split_data
             )
             results['models']['gradient_boosted_survival'] = gbs_results
         except Exception as e:
@@ -436,7 +535,8 @@ def compare_survival_models(
         # CoxNet
         try:
             coxnet_results = train_coxnet_model(
-                csv_path, time_col, event_col, feature_cols
+                csv_path, time_col, event_col, feature_cols,
+                split_data=split_data
             )
             results['models']['coxnet'] = coxnet_results
         except Exception as e:
@@ -463,6 +563,50 @@ def compare_survival_models(
     return results
 
 
+@lru_cache(maxsize=8)
+def _fit_individual_model(
+    csv_path: str,
+    mtime: float,
+    model_type: str,
+    feature_cols: Tuple[str, ...],
+    time_col: str,
+    event_col: str,
+    n_estimators: int = 100,
+    random_state: int = 42
+) -> Tuple[Any, List[str], np.ndarray]:
+    """
+    Fit the model used by predict_individual_survival, memoized per file.
+    
+    The file's mtime is part of the cache key, so rewriting the CSV
+    triggers a retrain on the next call.
+    
+    Returns:
+        Tuple of (fitted model, feature_names, unique_times)
+    """
+    df = load_csv(csv_path)
+    X, y, feature_names = prepare_survival_data(df, time_col, event_col, list(feature_cols))
+    
+    if model_type == 'random_survival_forest':
+        model = RandomSurvivalForest(
+            n_estimators=n_estimators, random_state=random_state, n_jobs=-1
+        )
+    elif model_type == 'gradient_boosted_survival':
+        model = GradientBoostingSurvivalAnalysis(
+            n_estimators=n_estimators, random_state=random_state
+        )
+    else:
+        raise ValueError(f"Unknown model type: {model_type}")
+    
+    model.fit(X, y)
+    
+    if model_type == 'random_survival_forest':
+        # The cached forest only ever scores a single row; walking the
+        # trees serially beats the joblib dispatch overhead of n_jobs=-1.
+        model.set_params(n_jobs=1)
+    
+    return model, feature_names, np.unique(y['time'])
+
+
 def predict_individual_survival(
     csv_path: str,
     individual_features: Dict[str, float],
@@ -485,20 +629,15 @@ def predict_individual_survival(
     """
     check_sksurv_available()
     
-    # Load and prepare training data
-    df = pd.read_csv(csv_path)
-    feature_cols = list(individual_features.keys())
-    X, y, feature_names = prepare_survival_data(df, time_col, event_col, feature_cols)
-    
-    # Train model
-    if model_type == 'random_survival_forest':
-        model = RandomSurvivalForest(n_estimators=100, random_state=42, n_jobs=-1)
-    elif model_type == 'gradient_boosted_survival':
-        model = GradientBoostingSurvivalAnalysis(n_estimators=100, random_state=42)
-    else:
-        raise ValueError(f"Unknown model type: {model_type}")
-    
-    model.fit(X, y)
+    # Train model (or reuse the one fitted on the same file and features)
+    model, feature_names, unique_times = _fit_individual_model(
+        csv_path,
+        os.path.getmtime(csv_path),
+        model_type,
+        tuple(individual_features.keys()),
+        time_col,
+        event_col
+    )
     
     # Prepare individual features
     X_individual = np.array([[individual_features[f] for f in feature_names]])
@@ -506,14 +645,17 @@ def predict_individual_survival(
     # Predict survival function
     surv_func = model.predict_survival_function(X_individual)[0]
     
-    # Get time points
-    unique_times = np.unique(y['time'])
-    survival_probs = [surv_func(t) for t in unique_times]
+    # Evaluate at the training time points
+    survival_probs = surv_func(unique_times)
+    
+    # Median survival: first time the (non-increasing) curve drops to 0.5
+    median_idx = np.searchsorted(-survival_probs, -0.5, side='left')
+    median_idx = min(median_idx, len(unique_times) - 1)
     
     return {
         'model_type': model_type,
         'features': individual_features,
         'timeline': unique_times.tolist(),
-        'survival_probability': survival_probs,
-        'median_survival': float(unique_times[np.argmin(np.abs(np.array(survival_probs) - 0.5))])
+        'survival_probability': survival_probs.tolist(),
+        'median_survival': float(unique_times[median_idx])
     }
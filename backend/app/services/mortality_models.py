@@ -1,7 +1,12 @@
 """Actuarial mortality table analytics and graduation methods."""
+import copy
+import os
+from functools import lru_cache
+from math import comb
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
+from scipy.linalg import solveh_banded
 from scipy.optimize import curve_fit
 from scipy.interpolate import UnivariateSpline
 
@@ -21,46 +26,34 @@ def compute_life_table(ages: np.ndarray, qx: np.ndarray, radix: int = 100000) ->
         DataFrame with columns: age, qx, px, lx, dx, Lx, Tx, ex
     """
     n = len(ages)
+    px = 1 - qx  # Survival probability
     
-    # Initialize arrays
-    lx = np.zeros(n + 1)  # Survivors at age x (need n+1 for final age)
-    dx = np.zeros(n)      # Deaths between age x and x+1
-    Lx = np.zeros(n)      # Person-years lived between age x and x+1
-    Tx = np.zeros(n)      # Total person-years lived above age x
-    ex = np.zeros(n)      # Life expectancy at age x
-    px = 1 - qx           # Survival probability
-    
-    # Starting population
-    lx[0] = radix
-    
-    # Calculate lx (survivors) and dx (deaths)
-    for i in range(n):
-        dx[i] = lx[i] * qx[i]
-        lx[i + 1] = lx[i] - dx[i]
-    
-    # Calculate Lx (person-years lived)
-    for i in range(n):
-        # Average of survivors at start and end of interval
-        Lx[i] = (lx[i] + lx[i + 1]) / 2
-    
-    # Calculate Tx (total person-years above age x) - work backwards
-    Tx[n - 1] = Lx[n - 1]
-    for i in range(n - 2, -1, -1):
-        Tx[i] = Tx[i + 1] + Lx[i]
-    
-    # Calculate ex (life expectancy)
-    for i in range(n):
-        if lx[i] > 0:
-            ex[i] = Tx[i] / lx[i]
-        else:
-            ex[i] = 0
+    # Survivors at age x (n+1 entries, starting from the radix), accumulated
+    # in place rather than via concatenate + scale temporaries
+    lx = np.empty(n + 1)
+    lx[0] = 1.0
+    np.cumprod(px, out=lx[1:])
+    lx *= radix
+    
+    # Deaths between age x and x+1
+    dx = lx[:-1] * qx
+    
+    # Person-years lived: average of survivors at start and end of interval
+    Lx = lx[:-1] + lx[1:]
+    Lx /= 2
+    
+    # Total person-years lived above age x (reverse cumulative sum)
+    Tx = np.cumsum(Lx[::-1])[::-1]
+    
+    # Life expectancy (0 where nobody survives to age x)
+    ex = np.divide(Tx, lx[:-1], out=np.zeros(n), where=lx[:-1] > 0)
     
     # Create DataFrame
     life_table = pd.DataFrame({
         'age': ages,
         'qx': qx,
         'px': px,
-        'lx': lx[:n],
+        'lx': lx[:-1],
         'dx': dx,
         'Lx': Lx,
         'Tx': Tx,
@@ -91,6 +84,21 @@ def calculate_survival_probability(lx: np.ndarray, age_from: int, age_to: int) -
     return lx[age_to] / lx[age_from]
 
 
+def _force_of_mortality(ages: np.ndarray, qx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Force of mortality μ(x) = -ln(1-qx) at the ages where it is finite.
+    
+    Ages with qx <= 0, qx >= 1 or missing values carry no usable information
+    for a fit on μ (qx=1 maps to infinity), so they are masked out instead
+    of being nudged by a fudge constant.
+    
+    Returns:
+        Tuple of (boolean mask of fitted ages, μ(x) at those ages)
+    """
+    valid = (qx > 0) & (qx < 1) & np.isfinite(ages)
+    return valid, -np.log1p(-qx[valid])
+
+
 def fit_gompertz(ages: np.ndarray, qx: np.ndarray) -> Dict[str, Any]:
     """
     Fit Gompertz mortality model: μ(x) = α·exp(β·x)
@@ -104,30 +112,36 @@ def fit_gompertz(ages: np.ndarray, qx: np.ndarray) -> Dict[str, Any]:
     Returns:
         Dictionary with parameters (alpha, beta), fitted values, and goodness-of-fit
     """
-    # Convert qx to force of mortality μ(x) = -ln(1-qx)
-    # For small qx, μ(x) ≈ qx
-    mu_x = -np.log(1 - qx + 1e-10)  # Add small constant to avoid log(0)
+    # Convert qx to force of mortality μ(x) = -ln(1-qx) where it is finite
+    valid, mu_x = _force_of_mortality(ages, qx)
+    ages_fit = ages[valid]
     
     # Gompertz model: μ(x) = α·exp(β·x)
     def gompertz(x, alpha, beta):
         return alpha * np.exp(beta * x)
     
     try:
-        # Fit the model
-        params, _ = curve_fit(gompertz, ages, mu_x, p0=[0.0001, 0.1], maxfev=10000)
-        alpha, beta = params
+        # log μ(x) = log α + β·x is linear in age, so fit it in closed form
+        if len(mu_x) < 2:
+            raise ValueError("Need at least two ages with 0 < qx < 1")
+        beta, log_alpha = np.polyfit(ages_fit, np.log(mu_x), 1)
+        alpha = np.exp(log_alpha)
         
         # Generate fitted values
         mu_fitted = gompertz(ages, alpha, beta)
         qx_fitted = 1 - np.exp(-mu_fitted)
         
-        # Calculate R-squared
-        ss_res = np.sum((mu_x - mu_fitted) ** 2)
-        ss_tot = np.sum((mu_x - np.mean(mu_x)) ** 2)
+        # Calculate R-squared over the fitted ages (sums of squares as dot
+        # products, no squared temporaries)
+        resid = mu_x - mu_fitted[valid]
+        ss_res = resid @ resid
+        centered = mu_x - mu_x.mean()
+        ss_tot = centered @ centered
         r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
         
         # Calculate RMSE
-        rmse = np.sqrt(np.mean((qx - qx_fitted) ** 2))
+        qx_resid = qx - qx_fitted
+        rmse = np.sqrt((qx_resid @ qx_resid) / len(qx_resid))
         
         return {
             'model': 'gompertz',
@@ -167,29 +181,42 @@ def fit_makeham(ages: np.ndarray, qx: np.ndarray) -> Dict[str, Any]:
     Returns:
         Dictionary with parameters (A, B, C), fitted values, and goodness-of-fit
     """
-    # Convert qx to force of mortality
-    mu_x = -np.log(1 - qx + 1e-10)
+    # Convert qx to force of mortality where it is finite
+    valid, mu_x = _force_of_mortality(ages, qx)
+    ages_fit = ages[valid]
     
     # Makeham model: μ(x) = A + B·exp(C·x)
     def makeham(x, A, B, C):
         return A + B * np.exp(C * x)
     
+    # Analytic Jacobian: ∂μ/∂A = 1, ∂μ/∂B = exp(C·x), ∂μ/∂C = B·x·exp(C·x)
+    def makeham_jac(x, A, B, C):
+        e = np.exp(C * x)
+        return np.column_stack([np.ones(len(x)), e, B * x * e])
+    
     try:
         # Fit the model with initial guesses
-        params, _ = curve_fit(makeham, ages, mu_x, p0=[0.0001, 0.0001, 0.1], maxfev=10000)
+        params, _ = curve_fit(
+            makeham, ages_fit, mu_x, p0=[0.0001, 0.0001, 0.1], jac=makeham_jac,
+            check_finite=False, maxfev=10000
+        )
         A, B, C = params
         
         # Generate fitted values
         mu_fitted = makeham(ages, A, B, C)
         qx_fitted = 1 - np.exp(-mu_fitted)
         
-        # Calculate R-squared
-        ss_res = np.sum((mu_x - mu_fitted) ** 2)
-        ss_tot = np.sum((mu_x - np.mean(mu_x)) ** 2)
+        # Calculate R-squared over the fitted ages (sums of squares as dot
+        # products, no squared temporaries)
+        resid = mu_x - mu_fitted[valid]
+        ss_res = resid @ resid
+        centered = mu_x - mu_x.mean()
+        ss_tot = centered @ centered
         r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
         
         # Calculate RMSE
-        rmse = np.sqrt(np.mean((qx - qx_fitted) ** 2))
+        qx_resid = qx - qx_fitted
+        rmse = np.sqrt((qx_resid @ qx_resid) / len(qx_resid))
         
         return {
             'model': 'makeham',
@@ -233,22 +260,27 @@ def whittaker_henderson(qx: np.ndarray, order: int = 3, lambda_param: float = 10
     """
     n = len(qx)
     
-    # Create identity matrix for the fidelity term
-    I = np.eye(n)
-    
-    # Create difference matrix D of order 'order'
-    D = np.eye(n)
-    for _ in range(order):
-        D = np.diff(D, axis=0)
-    
-    # Whittaker-Henderson solution: (I + λ·D'D)^(-1) · qx
-    penalty_matrix = lambda_param * (D.T @ D)
-    
-    # Add small regularization for numerical stability
-    A = I + penalty_matrix + 1e-10 * np.eye(n)
+    # The d-th order difference operator D has n-d rows, each holding the
+    # signed binomial coefficients c_j = (-1)^j·C(d, j) shifted one column
+    # to the right. D'D is therefore banded with bandwidth d, and entry
+    # (i, i+k) sums c_j·c_{j+k} over the rows i-j that exist.
+    c = np.array([(-1) ** j * comb(order, j) for j in range(order + 1)], dtype=np.float64)
+    n_rows = max(n - order, 0)
+    
+    # I + λ·D'D is symmetric positive-definite with bandwidth 'order', so
+    # store only its upper diagonals and use a banded Cholesky solve
+    bandwidth = min(order, n - 1)
+    ab = np.zeros((bandwidth + 1, n))
+    for k in range(bandwidth + 1):
+        band = ab[bandwidth - k, k:]
+        for j in range(order - k + 1):
+            band[j:j + n_rows] += lambda_param * c[j] * c[j + k]
+    
+    # Identity (fidelity term) plus small regularization for numerical stability
+    ab[bandwidth] += 1 + 1e-10
     
     # Solve the system
-    qx_graduated = np.linalg.solve(A, qx)
+    qx_graduated = solveh_banded(ab, qx, lower=False)
     
     # Ensure graduated values are valid probabilities [0, 1]
     qx_graduated = np.clip(qx_graduated, 0, 1)
@@ -256,6 +288,13 @@ def whittaker_henderson(qx: np.ndarray, order: int = 3, lambda_param: float = 10
     return qx_graduated
 
 
+def _triangular_weights(window_len: int) -> np.ndarray:
+    """Normalized triangular weights for a window (center gets highest weight)."""
+    center = window_len // 2
+    weights = 1 + center - np.abs(np.arange(window_len) - center)
+    return weights / weights.sum()
+
+
 def moving_average_smooth(qx: np.ndarray, window_size: int = 5, weighted: bool = True) -> np.ndarray:
     """
     Smooth mortality rates using moving average.
@@ -275,30 +314,25 @@ def moving_average_smooth(qx: np.ndarray, window_size: int = 5, weighted: bool =
     qx_smooth = np.zeros(n)
     half_window = window_size // 2
     
-    if weighted:
-        # Create triangular weights (center gets highest weight)
-        weights = np.array([1 + half_window - abs(i - half_window) for i in range(window_size)])
-        weights = weights / weights.sum()
-    else:
-        # Uniform weights
-        weights = np.ones(window_size) / window_size
+    # Interior points see the full window
+    if n >= window_size:
+        if weighted:
+            weights = _triangular_weights(window_size)
+            qx_smooth[half_window:n - half_window] = np.convolve(qx, weights, mode='valid')
+        else:
+            # Uniform weights: running sum over the window
+            csum = np.cumsum(np.insert(qx, 0, 0.0))
+            qx_smooth[half_window:n - half_window] = (csum[window_size:] - csum[:-window_size]) / window_size
     
-    for i in range(n):
-        # Determine window boundaries
+    # Boundary points use a truncated window with re-normalized weights
+    edges = np.r_[0:min(half_window, n), max(half_window, n - half_window):n]
+    for i in edges:
         start = max(0, i - half_window)
         end = min(n, i + half_window + 1)
-        
-        # Adjust weights for boundary cases
-        if i < half_window or i >= n - half_window:
-            window_len = end - start
-            if weighted:
-                w = np.array([1 + window_len // 2 - abs(j - window_len // 2) for j in range(window_len)])
-                w = w / w.sum()
-            else:
-                w = np.ones(window_len) / window_len
-            qx_smooth[i] = np.sum(qx[start:end] * w)
+        if weighted:
+            qx_smooth[i] = qx[start:end] @ _triangular_weights(end - start)
         else:
-            qx_smooth[i] = np.sum(qx[start:end] * weights)
+            qx_smooth[i] = qx[start:end].mean()
     
     return qx_smooth
 
@@ -331,37 +365,21 @@ def penalized_spline_smooth(ages: np.ndarray, qx: np.ndarray, smoothing_param: f
         return qx
 
 
-def compute_mortality_dashboard(csv_path: str) -> Dict[str, Any]:
-    """
-    Compute comprehensive mortality table analytics dashboard.
-    
-    Args:
-        csv_path: Path to CSV file with mortality data
-                 Expected columns: 'age' and 'qx' (or similar mortality rate column)
-        
-    Returns:
-        Dictionary with:
-        - raw_data: Original mortality data
-        - life_table: Full actuarial life table
-        - graduated: Graduated rates from different methods
-        - fitted_models: Gompertz and Makeham fitted curves
-        - kpis: Key performance indicators
-    """
+def _build_mortality_dashboard(csv_path: str) -> Dict[str, Any]:
+    """Compute the mortality dashboard for a CSV file (uncached)."""
     # Load data
     df = pd.read_csv(csv_path)
     
     # Normalize column names
     df.columns = df.columns.str.strip().str.lower()
     
-    # Find age and mortality rate columns
-    age_col = None
-    qx_col = None
-    
-    for col in df.columns:
-        if col in ['age', 'x', 'ages']:
-            age_col = col
-        if col in ['qx', 'q_x', 'mortality', 'mortality_rate', 'death_rate', 'deaths']:
-            qx_col = col
+    # Find age and mortality rate columns (first match in priority order)
+    columns = set(df.columns)
+    age_col = next((c for c in ('age', 'x', 'ages') if c in columns), None)
+    qx_col = next(
+        (c for c in ('qx', 'q_x', 'mortality', 'mortality_rate', 'death_rate', 'deaths') if c in columns),
+        None
+    )
     
     if age_col is None:
         # Assume first column is age
@@ -400,32 +418,35 @@ def compute_mortality_dashboard(csv_path: str) -> Dict[str, Any]:
     
     # Median age at death (age where lx = 0.5 * radix)
     radix = float(life_table_df.loc[0, 'lx']) if len(life_table_df) > 0 else 100000
-    median_age_idx = np.argmin(np.abs(life_table_df['lx'].values - radix / 2))
+    # lx is non-increasing, so binary-search the first age at or below half
+    lx_values = life_table_df['lx'].values
+    median_age_idx = min(np.searchsorted(-lx_values, -radix / 2, side='left'), len(lx_values) - 1)
     median_age_at_death = float(life_table_df.loc[median_age_idx, 'age'])
     
     # Total deaths in life table
     total_deaths = float(life_table_df['dx'].sum())
     
-    # Prepare response
+    # Prepare response (the age axis is shared by every series)
+    ages_list = ages.tolist()
     return {
         'raw_data': {
-            'ages': ages.tolist(),
+            'ages': ages_list,
             'qx': qx_raw.tolist()
         },
         'life_table': life_table_df.to_dict('records'),
         'graduated': {
             'whittaker_henderson': {
-                'ages': ages.tolist(),
+                'ages': ages_list,
                 'qx': qx_whittaker.tolist(),
                 'method': 'Whittaker-Henderson (order=3, λ=100)'
             },
             'moving_average': {
-                'ages': ages.tolist(),
+                'ages': ages_list,
                 'qx': qx_moving_avg.tolist(),
                 'method': 'Weighted Moving Average (window=5)'
             },
             'penalized_spline': {
-                'ages': ages.tolist(),
+                'ages': ages_list,
                 'qx': qx_spline.tolist(),
                 'method': 'Penalized Cubic Spline'
             }
@@ -450,3 +471,33 @@ def compute_mortality_dashboard(csv_path: str) -> Dict[str, Any]:
             'qx_column': qx_col
         }
     }
+
+
+@lru_cache(maxsize=32)
+def _cached_mortality_dashboard(csv_path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Memoize the dashboard per file version; mtime_ns and size only key the cache."""
+    return _build_mortality_dashboard(csv_path)
+
+
+def compute_mortality_dashboard(csv_path: str) -> Dict[str, Any]:
+    """
+    Compute comprehensive mortality table analytics dashboard.
+    
+    Args:
+        csv_path: Path to CSV file with mortality data
+                 Expected columns: 'age' and 'qx' (or similar mortality rate column)
+        
+    Returns:
+        Dictionary with:
+        - raw_data: Original mortality data
+        - life_table: Full actuarial life table
+        - graduated: Graduated rates from different methods
+        - fitted_models: Gompertz and Makeham fitted curves
+        - kpis: Key performance indicators
+    """
+    # Reuse the previous result while the file is unchanged
+    stat = os.stat(csv_path)
+    result = _cached_mortality_dashboard(csv_path, stat.st_mtime_ns, stat.st_size)
+    
+    # Hand out a copy so callers cannot mutate the cached result
+    return copy.deepcopy(result)
@@ -1,12 +1,20 @@
 """Natural Language Query service for AI-powered data visualization."""
 import os
+import asyncio
+import copy
+import hashlib
+import re
+import threading
 import pandas as pd
 import numpy as np
 import google.generativeai as genai
-from typing import Dict, Any, List, Optional
-import json
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
+from app.utils.csv_loader import load_csv
+from app.utils.json_utils import dumps, extract_json
 
 # Load environment variables
 backend_dir = Path(__file__).parent.parent.parent
@@ -20,73 +28,54 @@ if GEMINI_API_KEY:
 else:
     print(f"[WARN] NLQ Service: No Gemini API key found")
 
+# Interpreted chart plans keyed by (CSV fingerprint, normalized query), in LRU order
+PLAN_CACHE_SIZE = 256
+_PLAN_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_PLAN_CACHE_LOCK = threading.Lock()
 
-class NLQService:
-    """Natural Language Query service using Gemini AI."""
+
+def _top_value_counts(values: pd.Series, k: int) -> Tuple[List[Any], List[int]]:
+    """
+    Return the k most frequent non-null values and their counts.
     
-    def __init__(self, csv_path: str):
-        """Initialize with dataset path."""
-        self.csv_path = csv_path
-        self.df = pd.read_csv(csv_path)
-        
-        if GEMINI_API_KEY:
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        else:
-            self.model = None
+    Equivalent to ``values.value_counts().head(k)`` but selects the top k
+    with argpartition instead of sorting every distinct value. Ties keep
+    first-appearance order.
+    """
+    codes, uniques = pd.factorize(values, sort=False)
+    counts = np.bincount(codes[codes >= 0])
+    
+    k = min(k, counts.size)
+    if k < counts.size:
+        top = np.argpartition(-counts, k - 1)[:k]
+    else:
+        top = np.arange(counts.size)
+    top = top[np.lexsort((top, -counts[top]))]
+    
+    return uniques.take(top).tolist(), counts[top].tolist()
+
 
+class NLQService:
+    """Natural Language Query service using Gemini AI."""
     
-    def get_dataset_info(self) -> Dict[str, Any]:
-        """Get dataset information for context."""
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = self.df.select_dtypes(include=['object', 'category']).columns.tolist()
-        date_cols = [col for col in self.df.columns if 'date' in col.lower() or 'time' in col.lower()]
-        
-        return {
-            "columns": list(self.df.columns),
-            "numeric_columns": numeric_cols,
-            "categorical_columns": categorical_cols,
-            "date_columns": date_cols,
-            "row_count": len(self.df),
-            "sample_data": self.df.head(3).to_dict('records')
-        }
+    # Identifier-like words, used to match query text against column names
+    _WORD = re.compile(r"[a-z_][a-z0-9_]*")
     
-    def interpret_query(self, query: str) -> Dict[str, Any]:
-        """
-        Interpret natural language query and generate chart plan.
-        
-        Args:
-            query: Natural language query (e.g., "Plot claim severity by age")
-        
-        Returns:
-            {
-                "chart_type": "bar|line|scatter|histogram|pie|survival",
-                "x_column": "column_name",
-                "y_column": "column_name",
-                "aggregation": "sum|mean|count|none",
-                "group_by": "column_name" or null,
-                "filters": {...},
-                "reasoning": "AI explanation",
-                "columns_used": ["col1", "col2"]
-            }
-        """
-        if not self.model:
-            return self._fallback_interpretation(query)
-        
-        dataset_info = self.get_dataset_info()
-        
-        prompt = f"""You are an expert data analyst. Interpret this natural language query and generate a chart plan.
+    # Static prompt templates; only the dataset fields and query are filled in
+    _DATASET_CONTEXT_TEMPLATE = """You are an expert data analyst. Interpret this natural language query and generate a chart plan.
 
 DATASET INFORMATION:
-- Available Columns: {dataset_info['columns']}
-- Numeric Columns: {dataset_info['numeric_columns']}
-- Categorical Columns: {dataset_info['categorical_columns']}
-- Date/Time Columns: {dataset_info['date_columns']}
-- Total Rows: {dataset_info['row_count']}
+- Available Columns: {columns}
+- Numeric Columns: {numeric_columns}
+- Categorical Columns: {categorical_columns}
+- Date/Time Columns: {date_columns}
+- Total Rows: {row_count}
 
 Sample Data (first 3 rows):
-{json.dumps(dataset_info['sample_data'], indent=2)}
-
-USER QUERY: "{query}"
+{sample_data}
+"""
+    
+    _QUERY_PROMPT_TEMPLATE = """USER QUERY: "{query}"
 
 INSTRUCTIONS:
 1. Identify the intent (plot, compare, show distribution, analyze trend, etc.)
@@ -131,23 +120,118 @@ IMPORTANT:
 - If the query is ambiguous, make reasonable assumptions
 - Return ONLY valid JSON, no markdown formatting
 """
+    
+    def __init__(self, csv_path: str):
+        """Initialize with dataset path."""
+        self.csv_path = csv_path
+        self.df = load_csv(csv_path)
+        
+        # Column partitions and samples are fixed for the life of the service
+        self._columns = self.df.columns.tolist()
+        self._numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
+        self._categorical_cols = self.df.select_dtypes(include=['object', 'category']).columns.tolist()
+        self._date_cols = [col for col in self._columns if 'date' in col.lower() or 'time' in col.lower()]
+        
+        # Lower-cased column names and their words, for matching against queries;
+        # snake_case names also contribute their parts, so "claim amount" matches
+        # claim_amount (single characters are skipped, they match too much prose)
+        self._col_token_set = set()
+        for col in self._columns:
+            col_lower = str(col).lower()
+            self._col_token_set.add(col_lower)
+            for word in self._WORD.findall(col_lower):
+                self._col_token_set.add(word)
+                self._col_token_set.update(part for part in word.split('_') if len(part) > 1)
+        
+        # Sample rows as JSON-native values (datetimes as text, missing as None)
+        sample = self.df.head(3).copy()
+        present = sample.notna()
+        for col in sample.columns:
+            if pd.api.types.is_datetime64_any_dtype(sample[col]):
+                sample[col] = sample[col].astype(str)
+        self._sample_records = sample.astype(object).where(present, None).to_dict('records')
+        self._sample_json = dumps(self._sample_records)
+        
+        # The dataset part of the prompt is the same for every query
+        self._dataset_context = self._DATASET_CONTEXT_TEMPLATE.format(
+            columns=self._columns,
+            numeric_columns=self._numeric_cols,
+            categorical_columns=self._categorical_cols,
+            date_columns=self._date_cols,
+            row_count=len(self.df),
+            sample_data=self._sample_json
+        )
+        
+        # Histogram counts and labels per column, filled on first request
+        self._hist_cache: Dict[str, tuple] = {}
+        
+        # Identifies this version of the file for the chart plan cache
+        mtime = os.path.getmtime(csv_path)
+        self._csv_fingerprint = hashlib.sha1(f"{csv_path}:{mtime}".encode()).hexdigest()
+        
+        if GEMINI_API_KEY:
+            self.model = genai.GenerativeModel('gemini-1.5-flash')
+        else:
+            self.model = None
+
+    
+    def get_dataset_info(self) -> Dict[str, Any]:
+        """Get dataset information for context."""
+        return {
+            "columns": self._columns,
+            "numeric_columns": self._numeric_cols,
+            "categorical_columns": self._categorical_cols,
+            "date_columns": self._date_cols,
+            "row_count": len(self.df),
+            "sample_data": self._sample_records
+        }
+    
+    def interpret_query(self, query: str) -> Dict[str, Any]:
+        """
+        Interpret natural language query and generate chart plan.
+        
+        Args:
+            query: Natural language query (e.g., "Plot claim severity by age")
+        
+        Returns:
+            {
+                "chart_type": "bar|line|scatter|histogram|pie|survival",
+                "x_column": "column_name",
+                "y_column": "column_name",
+                "aggregation": "sum|mean|count|none",
+                "group_by": "column_name" or null,
+                "filters": {...},
+                "reasoning": "AI explanation",
+                "columns_used": ["col1", "col2"]
+            }
+        """
+        if not self.model:
+            return self._fallback_interpretation(query)
+        
+        # Short queries that name no column give Gemini nothing to work with
+        query_tokens = set(self._WORD.findall(query.lower()))
+        if not (query_tokens & self._col_token_set) and len(query.split()) < 6:
+            print(f"[INFO] Query mentions no dataset columns, using fallback: {query}")
+            return self._fallback_interpretation(query)
+        
+        # Repeated queries against the same file skip the API call
+        cache_key = (self._csv_fingerprint, " ".join(query.lower().split()))
+        with _PLAN_CACHE_LOCK:
+            cached_plan = _PLAN_CACHE.get(cache_key)
+            if cached_plan is not None:
+                _PLAN_CACHE.move_to_end(cache_key)
+        if cached_plan is not None:
+            print(f"[INFO] Using cached interpretation for query: {query}")
+            return copy.deepcopy(cached_plan)
         
         try:
             print(f"[INFO] Interpreting query: {query}")
+            prompt = self._dataset_context + "\n" + self._QUERY_PROMPT_TEMPLATE.format(query=query)
             response = self.model.generate_content(prompt)
             response_text = response.text
             
             # Extract JSON from markdown if present
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                response_text = response_text[json_start:json_end].strip()
-            
-            plan = json.loads(response_text)
+            plan = extract_json(response_text)
             
             # Validate that we got a proper chart plan
             if not plan.get('chart_type') or not plan.get('x_column'):
@@ -155,6 +239,10 @@ IMPORTANT:
                 return self._fallback_interpretation(query)
             
             print(f"[INFO] Query interpreted successfully: {plan['chart_type']}")
+            with _PLAN_CACHE_LOCK:
+                _PLAN_CACHE[cache_key] = copy.deepcopy(plan)
+                if len(_PLAN_CACHE) > PLAN_CACHE_SIZE:
+                    _PLAN_CACHE.popitem(last=False)
             return plan
             
         except Exception as e:
@@ -281,19 +369,27 @@ IMPORTANT:
     
     def _prepare_histogram(self, column: str, plan: Dict) -> Dict:
         """Prepare histogram data."""
-        values = self.df[column].dropna()
+        cached = self._hist_cache.get(column)
+        if cached is None:
+            values = self.df[column].to_numpy()
+            if np.issubdtype(values.dtype, np.floating):
+                values = values[~np.isnan(values)]
+            
+            # Calculate histogram bins
+            counts, bins = np.histogram(values, bins=20)
+            bin_labels = [f"{bins[i]:.1f}-{bins[i+1]:.1f}" for i in range(len(bins)-1)]
+            cached = (counts.tolist(), bin_labels)
+            self._hist_cache[column] = cached
         
-        # Calculate histogram bins
-        counts, bins = np.histogram(values, bins=20)
-        bin_labels = [f"{bins[i]:.1f}-{bins[i+1]:.1f}" for i in range(len(bins)-1)]
+        counts_list, bin_labels = cached
         
         return {
             "chart_type": "histogram",
             "chart_data": {
-                "labels": bin_labels,
+                "labels": list(bin_labels),
                 "datasets": [{
                     "label": column,
-                    "data": counts.tolist(),
+                    "data": list(counts_list),
                     "backgroundColor": "rgba(33, 150, 243, 0.6)",
                     "borderColor": "rgba(33, 150, 243, 1)",
                     "borderWidth": 1
@@ -308,12 +404,10 @@ IMPORTANT:
         """Prepare bar chart data."""
         if aggregation == 'count':
             # Count frequency
-            data = self.df[x_column].value_counts().head(20)
-            labels = data.index.tolist()
-            values = data.values.tolist()
+            labels, values = _top_value_counts(self.df[x_column], 20)
         else:
-            # Group and aggregate
-            grouped = self.df.groupby(x_column)[y_column]
+            # Group and aggregate; keys are ordered below, after truncation
+            grouped = self.df.groupby(x_column, observed=True, sort=False)[y_column]
             
             if aggregation == 'sum':
                 data = grouped.sum()
@@ -324,7 +418,10 @@ IMPORTANT:
             else:
                 data = grouped.mean()
             
-            data = data.head(20)
+            # Keep the 20 largest bars, shown in category order
+            if len(data) > 20:
+                data = data.nlargest(20)
+            data = data.sort_index()
             labels = data.index.tolist()
             values = data.values.tolist()
         
@@ -347,12 +444,15 @@ IMPORTANT:
     
     def _prepare_line_chart(self, x_column: str, y_column: str, aggregation: str, plan: Dict) -> Dict:
         """Prepare line chart data."""
-        # Sort by x column
-        df_sorted = self.df[[x_column, y_column]].dropna().sort_values(x_column)
+        x_values = self.df[x_column].to_numpy()
+        y_values = self.df[y_column].to_numpy()
+        complete = ~(pd.isna(x_values) | pd.isna(y_values))
+        x_values = x_values[complete]
+        y_values = y_values[complete]
         
         if aggregation != 'none':
-            # Group and aggregate
-            grouped = df_sorted.groupby(x_column)[y_column]
+            # Group and aggregate (groupby orders the keys itself)
+            grouped = pd.Series(y_values).groupby(x_values)
             if aggregation == 'mean':
                 data = grouped.mean()
             elif aggregation == 'sum':
@@ -363,8 +463,10 @@ IMPORTANT:
             labels = data.index.tolist()
             values = data.values.tolist()
         else:
-            labels = df_sorted[x_column].head(100).tolist()
-            values = df_sorted[y_column].head(100).tolist()
+            # Sort by x column
+            order = np.argsort(x_values, kind='stable')[:100]
+            labels = x_values[order].tolist()
+            values = y_values[order].tolist()
         
         return {
             "chart_type": "line",
@@ -386,11 +488,12 @@ IMPORTANT:
     
     def _prepare_scatter_chart(self, x_column: str, y_column: str, plan: Dict) -> Dict:
         """Prepare scatter plot data."""
-        df_clean = self.df[[x_column, y_column]].dropna()
+        df_clean = self.df[[x_column, y_column]].dropna().head(500)
         
+        # tolist() converts each column to Python scalars in one pass
         scatter_data = [
-            {"x": row[x_column], "y": row[y_column]}
-            for _, row in df_clean.head(500).iterrows()
+            {"x": x, "y": y}
+            for x, y in zip(df_clean[x_column].tolist(), df_clean[y_column].tolist())
         ]
         
         return {
@@ -411,12 +514,11 @@ IMPORTANT:
     def _prepare_pie_chart(self, x_column: str, y_column: str, aggregation: str, plan: Dict) -> Dict:
         """Prepare pie chart data."""
         if aggregation == 'count' or not y_column:
-            data = self.df[x_column].value_counts().head(10)
+            labels, values = _top_value_counts(self.df[x_column], 10)
         else:
             data = self.df.groupby(x_column)[y_column].sum().head(10)
-        
-        labels = data.index.tolist()
-        values = data.values.tolist()
+            labels = data.index.tolist()
+            values = data.values.tolist()
         
         # Generate colors
         colors = [
@@ -440,14 +542,12 @@ IMPORTANT:
     
     def _prepare_boxplot(self, column: str, plan: Dict) -> Dict:
         """Prepare boxplot data (simplified as bar chart with quartiles)."""
-        values = self.df[column].dropna().sort_values()
+        values = self.df[column].to_numpy()
+        values = values[~pd.isna(values)]
         
         if len(values) > 0:
-            q1 = values.quantile(0.25)
-            median = values.quantile(0.5)
-            q3 = values.quantile(0.75)
-            min_val = values.min()
-            max_val = values.max()
+            # All five statistics from a single partition pass
+            min_val, q1, median, q3, max_val = np.quantile(values, [0.0, 0.25, 0.5, 0.75, 1.0]).tolist()
             
             return {
                 "chart_type": "bar",
@@ -473,15 +573,36 @@ IMPORTANT:
         if not y_column:
             raise ValueError("Heatmap requires both x and y columns")
         
-        # Create pivot table for heatmap
-        # Group by both columns and count occurrences or aggregate a third column
-        pivot_data = self.df.groupby([x_column, y_column]).size().unstack(fill_value=0)
-        
-        # Limit size for performance
-        if len(pivot_data.index) > 20:
-            pivot_data = pivot_data.head(20)
-        if len(pivot_data.columns) > 20:
-            pivot_data = pivot_data.iloc[:, :20]
+        x_series = self.df[x_column]
+        y_series = self.df[y_column]
+        
+        if (
+            pd.api.types.is_numeric_dtype(x_series) and pd.api.types.is_numeric_dtype(y_series)
+            and x_series.nunique() > 20 and y_series.nunique() > 20
+        ):
+            # Continuous pair: count over a 20x20 grid of value ranges
+            # instead of truncating to the first 20 distinct values
+            complete = (x_series.notna() & y_series.notna()).to_numpy()
+            counts, x_edges, y_edges = np.histogram2d(
+                x_series.to_numpy(dtype=np.float64)[complete],
+                y_series.to_numpy(dtype=np.float64)[complete],
+                bins=20
+            )
+            pivot_data = pd.DataFrame(
+                counts.astype(np.int64),
+                index=[f"{x_edges[i]:.1f}-{x_edges[i+1]:.1f}" for i in range(len(x_edges)-1)],
+                columns=[f"{y_edges[i]:.1f}-{y_edges[i+1]:.1f}" for i in range(len(y_edges)-1)]
+            )
+        else:
+            # Create pivot table for heatmap
+            # Group by both columns and count occurrences or aggregate a third column
+            pivot_data = self.df.groupby([x_column, y_column]).size().unstack(fill_value=0)
+            
+            # Limit size for performance
+            if len(pivot_data.index) > 20:
+                pivot_data = pivot_data.head(20)
+            if len(pivot_data.columns) > 20:
+                pivot_data = pivot_data.iloc[:, :20]
         
         # Convert to format suitable for Chart.js heatmap (using matrix plugin)
         # For now, return as a simple grid that can be rendered as a table or converted to scatter
@@ -489,23 +610,25 @@ IMPORTANT:
         y_labels = pivot_data.index.tolist()
         
         # Convert to scatter-like format with color intensity
-        heatmap_data = []
-        max_value = pivot_data.max().max() if not pivot_data.empty else 1
-        
-        # Pre-compute colors for each data point
-        colors = []
-        for i, y_val in enumerate(y_labels):
-            for j, x_val in enumerate(x_labels):
-                value = pivot_data.loc[y_val, x_val]
-                color = self._get_heatmap_color(float(value), max_value)
-                
-                heatmap_data.append({
-                    "x": str(x_val),
-                    "y": str(y_val),
-                    "v": float(value),
-                    "r": 15
-                })
-                colors.append(color)
+        matrix = pivot_data.values.astype(np.float64)
+        max_value = matrix.max() if matrix.size else 1
+        if max_value == 0:
+            intensity = np.zeros_like(matrix)
+        else:
+            intensity = matrix / max_value
+        
+        # Blue to red gradient, cells in row-major (y, x) order
+        reds = (255 * intensity).astype(np.int64).ravel().tolist()
+        blues = (255 * (1 - intensity)).astype(np.int64).ravel().tolist()
+        colors = [f"rgba({r}, 100, {b}, 0.7)" for r, b in zip(reds, blues)]
+        border_colors = [f"rgba({r}, 100, {b}, 1)" for r, b in zip(reds, blues)]
+        
+        x_strs = [str(x_val) for x_val in x_labels]
+        heatmap_data = [
+            {"x": x_str, "y": str(y_val), "v": value, "r": 15}
+            for y_val, row in zip(y_labels, matrix.tolist())
+            for x_str, value in zip(x_strs, row)
+        ]
         
         return {
             "chart_type": "heatmap",
@@ -514,7 +637,7 @@ IMPORTANT:
                     "label": f"{x_column} vs {y_column}",
                     "data": heatmap_data,
                     "backgroundColor": colors,
-                    "borderColor": [c.replace('0.7', '1') for c in colors]
+                    "borderColor": border_colors
                 }],
                 "x_labels": x_labels,
                 "y_labels": y_labels,
@@ -524,20 +647,13 @@ IMPORTANT:
             "columns_used": plan['columns_used'],
             "title": plan['title']
         }
-    
-    def _get_heatmap_color(self, value: float, max_value: float) -> str:
-        """Generate color based on value intensity."""
-        if max_value == 0:
-            intensity = 0
-        else:
-            intensity = value / max_value
-        
-        # Blue to red gradient
-        r = int(255 * intensity)
-        b = int(255 * (1 - intensity))
-        return f"rgba({r}, 100, {b}, 0.7)"
 
 
+@lru_cache(maxsize=8)
+def _get_service(csv_path: str, mtime_ns: int, size: int) -> NLQService:
+    """Share one service per file version; mtime_ns and size only key the cache."""
+    return NLQService(csv_path)
+
 
 def process_nlq(csv_path: str, query: str) -> Dict[str, Any]:
     """
@@ -550,7 +666,27 @@ def process_nlq(csv_path: str, query: str) -> Dict[str, Any]:
     Returns:
         Chart data with reasoning
     """
-    service = NLQService(csv_path)
+    # Reuse the loaded dataset while the file is unchanged
+    stat = os.stat(csv_path)
+    service = _get_service(csv_path, stat.st_mtime_ns, stat.st_size)
     plan = service.interpret_query(query)
     result = service.execute_chart_plan(plan)
     return result
+
+
+async def process_nlq_async(csv_path: str, query: str) -> Dict[str, Any]:
+    """
+    Async variant of process_nlq for use from the API event loop.
+    
+    The CSV read, Gemini round-trip and chart preparation all block, so
+    they run in a worker thread and the event loop keeps serving other
+    requests meanwhile.
+    
+    Args:
+        csv_path: Path to CSV file
+        query: Natural language query
+    
+    Returns:
+        Chart data with reasoning
+    """
+    return await asyncio.to_thread(process_nlq, csv_path, query)
@@ -18,50 +18,124 @@ Reports include:
 """
 
 import os
+import io
+import asyncio
+import importlib.util
 import json
+import tempfile
 import base64
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from xml.sax.saxutils import escape
 import pandas as pd
 import numpy as np
 
-# Document generation libraries
-try:
-    from docx import Document
-    from docx.shared import Inches, Pt, RGBColor
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
+from app.utils.json_utils import dumps, dumps_sorted, extract_json
+
+
+def _module_available(name: str) -> bool:
+    """Check whether a module can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# Document generation libraries (python-docx is imported when a Word report is built)
+DOCX_AVAILABLE = _module_available("docx")
+if not DOCX_AVAILABLE:
     print("[WARN] python-docx not installed. Word reports will not be available.")
 
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, PageBreak, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+# ReportLab is imported by the PDF builders when the first PDF report is built
+PDF_AVAILABLE = _module_available("reportlab")
+if not PDF_AVAILABLE:
     print("[WARN] reportlab not installed. PDF reports will not be available.")
 
-# Gemini AI for insights
-import google.generativeai as genai
+
+# Gemini AI for insights (google.generativeai is imported on first use)
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    GEMINI_AVAILABLE = True
-else:
+if not GEMINI_API_KEY:
     GEMINI_AVAILABLE = False
     print("[WARN] GEMINI_API_KEY not found. AI insights will be limited.")
+elif not _module_available("google.generativeai"):
+    GEMINI_AVAILABLE = False
+    print("[WARN] google-generativeai not installed. AI insights will be limited.")
+else:
+    GEMINI_AVAILABLE = True
+
+
+@lru_cache(maxsize=None)
+def _get_genai():
+    """Import and configure the Gemini client once per process."""
+    import google.generativeai as genai
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai
+
+
+@lru_cache(maxsize=4)
+def _get_model(name: str = 'gemini-1.5-flash'):
+    """Create a Gemini model once per process and reuse it for every report."""
+    return _get_genai().GenerativeModel(name)
+
+
+# Runs the Gemini request while a report body is being laid out; created on
+# first use and shared by every report built in this process
+_insight_executor: Optional[ThreadPoolExecutor] = None
+_insight_executor_lock = threading.Lock()
+
+
+def _get_insight_executor() -> ThreadPoolExecutor:
+    """Return the shared insight executor, creating it on first use."""
+    global _insight_executor
+    with _insight_executor_lock:
+        if _insight_executor is None:
+            _insight_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report-insights")
+        return _insight_executor
+
+
+def shutdown_report_executor():
+    """Shut down the insight executor; called when the application stops."""
+    global _insight_executor
+    with _insight_executor_lock:
+        if _insight_executor is not None:
+            _insight_executor.shutdown(wait=False, cancel_futures=True)
+            _insight_executor = None
+
+
+# Gemini insights by content hash, shared by every report rendered in this process,
+# in LRU order; older entries are still found in the on-disk cache
+INSIGHT_CACHE_SIZE = 128
+_INSIGHT_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_INSIGHT_CACHE_LOCK = threading.Lock()
+
+
+def _format_value(value, decimals: int) -> str:
+    """Format a value for display: thousands separators for numbers, 'N/A' for missing."""
+    if value is None or value == 'N/A':
+        return 'N/A'
+    if isinstance(value, (int, float)):
+        if decimals == 0:
+            return f"{value:,.0f}"
+        else:
+            return f"{value:,.{decimals}f}"
+    return str(value)
+
+
+# Report tables repeat the same values (0.0, small counts, 'N/A') many times;
+# typed=True keeps 1, 1.0 and True apart
+_format_value_cached = lru_cache(maxsize=8192, typed=True)(_format_value)
 
 
 class ReportGenerator:
@@ -80,26 +154,34 @@ class ReportGenerator:
         self.results = results
         self.dataset_id = dataset_id
         self.timestamp = datetime.now()
+        self.ts_display = self.timestamp.strftime('%Y-%m-%d %H:%M:%S')
         self.report_dir = Path("backend/analysis_results/reports")
         self.report_dir.mkdir(parents=True, exist_ok=True)
+        self._insights = None
+        self._table_width = None
+        self._section_style = None
+        self._kv_table_style = None
+        self._kv_cell_styles = None
+        self._results_hash = None
+        self._fallback_used = False
     
     # Helper Methods
     def _format_number(self, value, decimals: int = 2) -> str:
         """Safely format numeric values."""
-        if value is None or value == 'N/A':
-            return 'N/A'
-        if isinstance(value, (int, float)):
-            if decimals == 0:
-                return f"{value:,.0f}"
-            else:
-                return f"{value:,.{decimals}f}"
-        return str(value)
+        try:
+            return _format_value_cached(value, decimals)
+        except TypeError:
+            # Unhashable values (lists, dicts) bypass the cache
+            return _format_value(value, decimals)
     
     def _create_pdf_table(self, data: List[Dict], columns: List[str], max_rows: int = 50) -> Any:
         """Create formatted table for PDF reports."""
         if not PDF_AVAILABLE or not data:
             return None
         
+        from reportlab.platypus import LongTable, TableStyle
+        from reportlab.lib import colors
+        
         # Limit rows
         limited_data = data[:max_rows]
         
@@ -116,8 +198,12 @@ class ReportGenerator:
                     table_row.append(str(value))
             table_data.append(table_row)
         
-        # Create table
-        table = Table(table_data)
+        # Create table; fixed column widths skip ReportLab's width-fitting pass,
+        # and the header row repeats if the table splits across pages
+        col_widths = None
+        if self._table_width:
+            col_widths = [self._table_width / len(columns)] * len(columns)
+        table = LongTable(table_data, colWidths=col_widths, repeatRows=1)
         table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#283593')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -134,46 +220,178 @@ class ReportGenerator:
     
     def _add_section_header(self, story: List, title: str, styles, level: int = 3):
         """Add formatted section header to PDF."""
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.platypus import Paragraph
+        from reportlab.lib import colors
+        
         if level == 3:
-            header_style = ParagraphStyle(
-                'SectionHeader',
-                parent=styles['Heading3'],
-                fontSize=12,
-                textColor=colors.HexColor('#1a237e'),
-                spaceAfter=8,
-                spaceBefore=12,
-                bold=True
-            )
+            # Built on first use and shared by every section header in the report
+            if self._section_style is None:
+                self._section_style = ParagraphStyle(
+                    'SectionHeader',
+                    parent=styles['Heading3'],
+                    fontSize=12,
+                    textColor=colors.HexColor('#1a237e'),
+                    spaceAfter=8,
+                    spaceBefore=12,
+                    bold=True
+                )
+            header_style = self._section_style
         else:
             header_style = styles['Heading2']
         
         story.append(Paragraph(title, header_style))
     
-    def _add_key_value_pair(self, story: List, key: str, value: Any, styles):
-        """Add formatted key-value pair to PDF."""
-        text = f"<b>{key}:</b> {value}"
-        story.append(Paragraph(text, styles['Normal']))
+    def _add_key_value_pair(self, story: List, key: str, value: Any):
+        """Add a single key-value pair to PDF."""
+        self._add_key_value_table(story, [[key, value]])
+    
+    def _add_key_value_table(self, story: List, rows: List[List[Any]]):
+        """
+        Add a block of key-value rows to PDF as a single two-column table.
+        
+        Cells are plain strings, which ReportLab draws without parsing any
+        markup. Only a cell too wide for its column (a long model name or
+        formula) is wrapped in a Paragraph so it flows onto more lines.
+        """
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.platypus import Paragraph, Table, TableStyle
+        
+        if not rows:
+            return
+        if self._kv_table_style is None:
+            self._kv_cell_styles = (
+                ParagraphStyle('KeyValueKey', fontName='Helvetica-Bold', fontSize=9, leading=11),
+                ParagraphStyle('KeyValueValue', fontName='Helvetica', fontSize=9, leading=11)
+            )
+            self._kv_table_style = TableStyle([
+                ('FONT', (0, 0), (-1, -1), 'Helvetica', 9),
+                ('FONT', (0, 0), (0, -1), 'Helvetica-Bold', 9),
+                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                ('LEFTPADDING', (0, 0), (-1, -1), 0),
+                ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+                ('TOPPADDING', (0, 0), (-1, -1), 1),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+            ])
+        key_style, value_style = self._kv_cell_styles
+        
+        table_width = self._table_width or 6.5*inch
+        col_widths = [3*inch, table_width - 3*inch]
+        key_room = col_widths[0] - 8
+        value_room = col_widths[1] - 8
+        
+        cells = []
+        for key, value in rows:
+            key = str(key)
+            value = str(value)
+            if stringWidth(key, 'Helvetica-Bold', 9) > key_room:
+                # Leading spaces are an indent; Paragraphs would collapse them
+                indent = len(key) - len(key.lstrip(' '))
+                key = Paragraph('&nbsp;' * indent + escape(key.lstrip(' ')), key_style)
+            if stringWidth(value, 'Helvetica', 9) > value_room:
+                value = Paragraph(escape(value), value_style)
+            cells.append([key, value])
+        
+        table = Table(cells, colWidths=col_widths, hAlign='LEFT')
+        table.setStyle(self._kv_table_style)
+        story.append(table)
+    
+    def _add_bullets(self, story: List, items: List[str], styles):
+        """Add a bullet list to PDF as a single paragraph."""
+        from reportlab.platypus import Paragraph
         
-    def generate_report(self, format: str = "pdf") -> str:
+        if items:
+            story.append(Paragraph("<br/>".join(f"• {item}" for item in items), styles['Normal']))
+        
+    def generate_report(self, format: str = "pdf", force: bool = False) -> str:
         """
         Generate comprehensive report.
         
         Args:
             format: Report format ('pdf' or 'docx')
+            force: Rebuild even if a report for identical results already exists
             
         Returns:
             Path to generated report file
         """
-        if format.lower() == "pdf":
+        format = format.lower()
+        if format == "pdf":
             if not PDF_AVAILABLE:
                 raise ImportError("reportlab not installed. Install with: pip install reportlab")
-            return self._generate_pdf_report()
-        elif format.lower() == "docx":
+            build = self._generate_pdf_report
+        elif format == "docx":
             if not DOCX_AVAILABLE:
                 raise ImportError("python-docx not installed. Install with: pip install python-docx")
-            return self._generate_word_report()
+            build = self._generate_word_report
         else:
             raise ValueError(f"Unsupported format: {format}. Use 'pdf' or 'docx'.")
+        
+        # Reports are named by content, so an existing file was rendered from the same
+        # results (reports with rule-based insights are never written under this name)
+        filepath = self._report_path(format)
+        if filepath.exists() and not force:
+            return str(filepath)
+        
+        return build()
+    
+    def _report_path(self, extension: str) -> Path:
+        """Path of the report file for these results in the given format."""
+        return self.report_dir / f"{self.analysis_type}_report_{self.dataset_id}_{self._results_key()}.{extension}"
+    
+    def _output_path(self, extension: str) -> Path:
+        """
+        Path to write a freshly built report to.
+        
+        Reports with Gemini insights go to the content-addressed path so later
+        requests reuse them. Reports built from the rule-based fallback get a
+        timestamped name instead, so the next request retries Gemini rather
+        than serving the fallback for good.
+        """
+        if self._fallback_used:
+            ts_file = self.timestamp.strftime('%Y%m%d_%H%M%S')
+            return self.report_dir / f"{self.analysis_type}_report_{self.dataset_id}_{ts_file}.{extension}"
+        return self._report_path(extension)
+    
+    def _write_report(self, filepath: Path, write) -> str:
+        """
+        Write a report to a private temp file, then move it into place.
+        
+        A failed build never leaves a partial file behind, and concurrent builds
+        of the same results never share a temp file.
+        
+        Args:
+            filepath: Final report path
+            write: Callable that writes the report to the path it is given
+            
+        Returns:
+            Path to the report file
+        """
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.report_dir, prefix=f".{filepath.stem}.", suffix=f"{filepath.suffix}.tmp"
+        )
+        os.close(fd)
+        try:
+            write(tmp_name)
+            try:
+                os.replace(tmp_name, filepath)
+            except OSError:
+                # A concurrent build of the same results already put its copy in place
+                if not filepath.exists():
+                    raise
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+        
+        return str(filepath)
+    
+    def _results_key(self) -> str:
+        """Content hash of the analysis results."""
+        if self._results_hash is None:
+            payload = dumps_sorted(self.results)
+            self._results_hash = hashlib.blake2b(payload, digest_size=8).hexdigest()
+        return self._results_hash
     
     def _generate_ai_insights(self) -> Dict[str, Any]:
         """
@@ -182,12 +400,22 @@ class ReportGenerator:
         Returns:
             Dictionary with executive summary, key insights, and business implications
         """
+        if self._insights is not None:
+            return self._insights
+        
         if not GEMINI_AVAILABLE:
             return self._generate_fallback_insights()
         
         try:
-            # Prepare analysis summary for Gemini
-            summary = self._prepare_analysis_summary()
+            # Prepare analysis summary for Gemini, bounded to keep the prompt small
+            summary = self._compact(self._prepare_analysis_summary())
+            
+            # Reuse insights already generated for the same results (e.g. PDF then DOCX)
+            cache_key = self._insight_cache_key(summary)
+            cached = self._load_cached_insights(cache_key)
+            if cached is not None:
+                self._insights = cached
+                return cached
             
             # Create prompt for Gemini
             prompt = f"""
@@ -197,7 +425,7 @@ Dataset: {self.dataset_id}
 Analysis Type: {self.analysis_type}
 
 Analysis Results Summary:
-{json.dumps(summary, indent=2, default=str)}
+{dumps(summary)}
 
 Please provide a comprehensive analysis report with the following sections:
 
@@ -228,27 +456,78 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
 """
             
             # Call Gemini API
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            model = _get_model()
             response = model.generate_content(prompt)
             
             # Parse response
             response_text = response.text.strip()
             
             # Extract JSON from markdown code blocks if present
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
+            insights = extract_json(response_text)
             
-            insights = json.loads(response_text)
+            # Don't cache (or render) a response that is missing report sections
+            missing = [k for k in ("executive_summary", "key_insights", "business_implications", "limitations")
+                       if k not in insights]
+            if missing:
+                raise ValueError(f"response missing {', '.join(missing)}")
+            
+            self._store_cached_insights(cache_key, insights)
+            self._insights = insights
             return insights
             
         except Exception as e:
             print(f"[WARN] Gemini AI insights failed: {e}")
             return self._generate_fallback_insights()
     
+    def _insight_cache_key(self, summary: Dict[str, Any]) -> str:
+        """Content hash of the analysis summary; the report timestamp is excluded."""
+        key_data = {k: v for k, v in summary.items() if k != "timestamp"}
+        return hashlib.sha1(json.dumps(key_data, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _load_cached_insights(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Look up insights in the process cache, then on disk."""
+        with _INSIGHT_CACHE_LOCK:
+            cached = _INSIGHT_CACHE.get(cache_key)
+            if cached is not None:
+                _INSIGHT_CACHE.move_to_end(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        cache_path = self.report_dir / ".insight_cache" / f"{cache_key}.json"
+        if cache_path.exists():
+            try:
+                with open(cache_path) as f:
+                    insights = json.load(f)
+                self._remember_insights(cache_key, insights)
+                return copy.deepcopy(insights)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Ignoring unreadable insight cache entry {cache_path}: {e}")
+        
+        return None
+    
+    def _store_cached_insights(self, cache_key: str, insights: Dict[str, Any]):
+        """Remember insights in the process cache and on disk."""
+        self._remember_insights(cache_key, copy.deepcopy(insights))
+        
+        cache_dir = self.report_dir / ".insight_cache"
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(cache_dir / f"{cache_key}.json", "w") as f:
+                json.dump(insights, f)
+        except OSError as e:
+            print(f"[WARN] Could not write insight cache: {e}")
+    
+    def _remember_insights(self, cache_key: str, insights: Dict[str, Any]):
+        """Add insights to the process cache, evicting the least recently used entry."""
+        with _INSIGHT_CACHE_LOCK:
+            _INSIGHT_CACHE[cache_key] = insights
+            _INSIGHT_CACHE.move_to_end(cache_key)
+            if len(_INSIGHT_CACHE) > INSIGHT_CACHE_SIZE:
+                _INSIGHT_CACHE.popitem(last=False)
+    
     def _generate_fallback_insights(self) -> Dict[str, Any]:
         """Generate rule-based insights when Gemini is unavailable."""
+        self._fallback_used = True
         insights = {
             "executive_summary": f"Completed {self.analysis_type} analysis on dataset {self.dataset_id}. Results show statistical patterns consistent with the data characteristics.",
             "key_insights": [
@@ -283,6 +562,36 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
         
         return insights
     
+    def _compact(self, obj: Any, max_list: int = 10, max_str: int = 500) -> Any:
+        """
+        Bound the size of a summary before it is sent to Gemini.
+        
+        Long numeric lists are replaced by their mean/std/min/max, other lists
+        keep their first ``max_list`` items and strings are cut at ``max_str``
+        characters, so the prompt payload stays within a few KB.
+        """
+        if isinstance(obj, dict):
+            return {k: self._compact(v, max_list, max_str) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple, np.ndarray)):
+            if len(obj) > max_list:
+                try:
+                    arr = np.asarray(obj)
+                except ValueError:  # ragged nested lists
+                    arr = None
+                if arr is not None and arr.dtype.kind in "iuf" and arr.ndim == 1:
+                    return {
+                        "mean": float(arr.mean()),
+                        "std": float(arr.std()),
+                        "min": float(arr.min()),
+                        "max": float(arr.max()),
+                        "n": int(arr.size)
+                    }
+                obj = obj[:max_list]
+            return [self._compact(v, max_list, max_str) for v in obj]
+        if isinstance(obj, str) and len(obj) > max_str:
+            return obj[:max_str] + "..."
+        return obj
+    
     def _prepare_analysis_summary(self) -> Dict[str, Any]:
         """Prepare concise summary of analysis results for AI processing."""
         summary = {
@@ -321,11 +630,20 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
     
     def _generate_pdf_report(self) -> str:
         """Generate PDF report using ReportLab."""
-        filename = f"{self.analysis_type}_report_{self.dataset_id}_{self.timestamp.strftime('%Y%m%d_%H%M%S')}.pdf"
-        filepath = self.report_dir / filename
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER
+        
+        # Request AI insights in the background; nothing before the executive summary needs them
+        insights_future = _get_insight_executor().submit(self._generate_ai_insights)
         
         # Create PDF document
-        doc = SimpleDocTemplate(str(filepath), pagesize=letter)
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        self._table_width = doc.width
         story = []
         styles = getSampleStyleSheet()
         
@@ -356,52 +674,54 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
         metadata_text = f"""
         <b>Dataset:</b> {self.dataset_id}<br/>
         <b>Analysis Type:</b> {self.analysis_type.title()}<br/>
-        <b>Generated:</b> {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}<br/>
+        <b>Generated:</b> {self.ts_display}<br/>
         <b>Platform:</b> ADaaS (Actuarial Data Analysis as a Service)
         """
         story.append(Paragraph(metadata_text, styles['Normal']))
         story.append(Spacer(1, 0.3*inch))
         
-        # Generate AI insights
-        insights = self._generate_ai_insights()
+        # Build the detailed results while the insights request is in flight
+        details = []
+        self._add_detailed_results_to_pdf(details, styles)
+        
+        # Model-generated text is escaped so ReportLab's markup parser treats it as plain text
+        insights = insights_future.result()
         
         # Executive Summary
         story.append(Paragraph("EXECUTIVE SUMMARY", heading_style))
-        story.append(Paragraph(insights["executive_summary"], styles['Normal']))
+        story.append(Paragraph(escape(insights["executive_summary"]), styles['Normal']))
         story.append(Spacer(1, 0.2*inch))
         
         # Key Insights
         story.append(Paragraph("KEY INSIGHTS", heading_style))
-        for insight in insights["key_insights"]:
-            story.append(Paragraph(f"• {insight}", styles['Normal']))
+        self._add_bullets(story, [escape(item) for item in insights["key_insights"]], styles)
         story.append(Spacer(1, 0.2*inch))
         
         # Model Performance
         if insights.get("model_performance"):
             story.append(Paragraph("MODEL PERFORMANCE", heading_style))
-            story.append(Paragraph(insights["model_performance"], styles['Normal']))
+            story.append(Paragraph(escape(insights["model_performance"]), styles['Normal']))
             story.append(Spacer(1, 0.2*inch))
         
         # Detailed Results
         story.append(Paragraph("DETAILED RESULTS", heading_style))
-        self._add_detailed_results_to_pdf(story, styles)
+        story.extend(details)
         story.append(Spacer(1, 0.2*inch))
         
         # Business Implications
         story.append(Paragraph("BUSINESS IMPLICATIONS", heading_style))
-        for implication in insights["business_implications"]:
-            story.append(Paragraph(f"• {implication}", styles['Normal']))
+        self._add_bullets(story, [escape(item) for item in insights["business_implications"]], styles)
         story.append(Spacer(1, 0.2*inch))
         
         # Limitations
         story.append(Paragraph("LIMITATIONS AND CAVEATS", heading_style))
-        for limitation in insights["limitations"]:
-            story.append(Paragraph(f"• {limitation}", styles['Normal']))
+        self._add_bullets(story, [escape(item) for item in insights["limitations"]], styles)
         
-        # Build PDF
+        # Build PDF in memory, then write it out in one step
         doc.build(story)
+        story.clear()
         
-        return str(filepath)
+        return self._write_report(self._output_path("pdf"), lambda path: Path(path).write_bytes(buffer.getvalue()))
     
     def _add_detailed_results_to_pdf(self, story: List, styles):
         """Add analysis-specific detailed results to PDF."""
@@ -420,19 +740,28 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
     
     def _add_survival_details_pdf(self, story: List, styles):
         """Add comprehensive survival analysis details to PDF."""
-        meta = self.results.get("meta", {})
-        km = self.results.get("overall_km", {})
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
+        
+        meta = self.results.get("meta") or {}
+        km = self.results.get("overall_km") or {}
+        n = meta.get('n')
+        n_events = meta.get('n_events')
+        n_censored = meta.get('n_censored')
         
         # === SECTION 1: Study Overview ===
         self._add_section_header(story, "Study Overview", styles)
-        self._add_key_value_pair(story, "Total Sample Size", self._format_number(meta.get('n', 'N/A'), 0), styles)
-        self._add_key_value_pair(story, "Number of Events", self._format_number(meta.get('n_events', 'N/A'), 0), styles)
-        self._add_key_value_pair(story, "Number Censored", self._format_number(meta.get('n_censored', 'N/A'), 0), styles)
+        rows = [
+            ["Total Sample Size", self._format_number(n, 0)],
+            ["Number of Events", self._format_number(n_events, 0)],
+            ["Number Censored", self._format_number(n_censored, 0)]
+        ]
         
-        if meta.get('n'):
-            event_rate = (meta.get('n_events', 0) / meta.get('n', 1)) * 100
-            self._add_key_value_pair(story, "Event Rate", f"{self._format_number(event_rate, 1)}%", styles)
+        if n:
+            event_rate = ((n_events or 0) / n) * 100
+            rows.append(["Event Rate", f"{self._format_number(event_rate, 1)}%"])
         
+        self._add_key_value_table(story, rows)
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 2: Kaplan-Meier Survival Analysis ===
@@ -441,31 +770,40 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
         median_surv = km.get('median_survival', 'N/A')
         mean_surv = km.get('mean_survival', 'N/A')
         
-        self._add_key_value_pair(story, "Median Survival Time", self._format_number(median_surv, 2), styles)
-        self._add_key_value_pair(story, "Mean Survival Time", self._format_number(mean_surv, 2), styles)
+        rows = [
+            ["Median Survival Time", self._format_number(median_surv, 2)],
+            ["Mean Survival Time", self._format_number(mean_surv, 2)]
+        ]
         
         # Confidence intervals if available
         if 'median_ci_lower' in km and 'median_ci_upper' in km:
             ci_text = f"[{self._format_number(km.get('median_ci_lower'), 2)}, {self._format_number(km.get('median_ci_upper'), 2)}]"
-            self._add_key_value_pair(story, "95% CI for Median", ci_text, styles)
+            rows.append(["95% CI for Median", ci_text])
         
+        self._add_key_value_table(story, rows)
         story.append(Spacer(1, 0.1*inch))
         
         # Survival probabilities at key time points
         story.append(Paragraph("<b>Survival Probabilities at Key Time Points:</b>", styles['Normal']))
         life_table = self.results.get("life_table", [])
         if life_table:
-            # Get survival at 25%, 50%, 75% of max time
-            max_time = max([row.get('time', 0) for row in life_table]) if life_table else 0
+            # Get survival at 25%, 50%, 75% of max time (life table rows are in time order)
+            times = np.asarray([row.get('time', 0) for row in life_table], dtype=np.float64)
+            max_time = times[-1]
             key_times = [max_time * 0.25, max_time * 0.5, max_time * 0.75, max_time]
             
+            rows = []
             for target_time in key_times:
-                # Find closest time point
-                closest = min(life_table, key=lambda x: abs(x.get('time', 0) - target_time))
+                # Find closest time point (earliest row on ties)
+                pos = min(int(np.searchsorted(times, target_time)), len(times) - 1)
+                if pos > 0 and abs(times[pos - 1] - target_time) <= abs(times[pos] - target_time):
+                    pos = int(np.searchsorted(times, times[pos - 1]))
+                closest = life_table[pos]
                 time_val = closest.get('time', 'N/A')
                 surv_val = closest.get('survival', 'N/A')
-                self._add_key_value_pair(story, f"  At time {self._format_number(time_val, 1)}", 
-                                        f"{self._format_number(surv_val * 100 if isinstance(surv_val, (int, float)) else surv_val, 1)}%", styles)
+                rows.append([f"  At time {self._format_number(time_val, 1)}",
+                             f"{self._format_number(surv_val * 100 if isinstance(surv_val, (int, float)) else surv_val, 1)}%"])
+            self._add_key_value_table(story, rows)
         
         story.append(Spacer(1, 0.15*inch))
         
@@ -502,7 +840,7 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             cumulative_hazard = nelson_aalen.get('cumulative_hazard', [])
             if cumulative_hazard:
                 final_hazard = cumulative_hazard[-1] if cumulative_hazard else 'N/A'
-                self._add_key_value_pair(story, "Final Cumulative Hazard", self._format_number(final_hazard, 4), styles)
+                self._add_key_value_pair(story, "Final Cumulative Hazard", self._format_number(final_hazard, 4))
             
             story.append(Spacer(1, 0.15*inch))
         
@@ -512,7 +850,7 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             self._add_section_header(story, "Cox Proportional Hazards Model", styles)
             
             c_index = cox.get('concordance', 'N/A')
-            self._add_key_value_pair(story, "Concordance Index (C-index)", self._format_number(c_index, 3), styles)
+            self._add_key_value_pair(story, "Concordance Index (C-index)", self._format_number(c_index, 3))
             
             story.append(Spacer(1, 0.1*inch))
             story.append(Paragraph("<b>Model Coefficients and Hazard Ratios:</b>", styles['Normal']))
@@ -520,14 +858,15 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             
             # Create coefficients table
             coeffs = cox.get('summary', [])
+            rows = []
             for coef in coeffs[:15]:  # Top 15 variables
                 var_name = coef.get('covariate', 'N/A')
                 coef_val = self._format_number(coef.get('coef', 'N/A'), 4)
                 hr = self._format_number(coef.get('exp_coef', 'N/A'), 3)
                 p_val = self._format_number(coef.get('p', 'N/A'), 4)
                 
-                text = f"<b>{var_name}:</b> Coef={coef_val}, HR={hr}, p={p_val}"
-                story.append(Paragraph(text, styles['Normal']))
+                rows.append([var_name, f"Coef={coef_val}, HR={hr}, p={p_val}"])
+            self._add_key_value_table(story, rows)
             
             if len(coeffs) > 15:
                 story.append(Paragraph(
@@ -550,13 +889,14 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             # Log-rank test
             logrank_p = strata.get('logrank_p')
             if logrank_p is not None:
-                self._add_key_value_pair(story, "Log-Rank Test P-value", self._format_number(logrank_p, 4), styles)
+                self._add_key_value_pair(story, "Log-Rank Test P-value", self._format_number(logrank_p, 4))
                 story.append(Spacer(1, 0.05*inch))
             
             # Results by group
             results = strata.get('results', [])
             if results:
                 story.append(Paragraph("<b>Survival by Group:</b>", styles['Normal']))
+                rows = []
                 for group_result in results[:10]:  # Top 10 groups
                     group_name = group_result.get('group', 'N/A')
                     n = self._format_number(group_result.get('n', 'N/A'), 0)
@@ -573,7 +913,8 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
                                 median_surv = self._format_number(timeline[i], 2)
                                 break
                     
-                    self._add_key_value_pair(story, f"  {group_name}", f"N={n}, Median={median_surv}", styles)
+                    rows.append([f"  {group_name}", f"N={n}, Median={median_surv}"])
+                self._add_key_value_table(story, rows)
                 
                 if len(results) > 10:
                     story.append(Paragraph(
@@ -587,28 +928,35 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
     
     def _add_glm_details_pdf(self, story: List, styles):
         """Add comprehensive GLM analysis details to PDF."""
-        model_info = self.results.get("model_info", {})
-        gof = self.results.get("goodness_of_fit", {})
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
+        
+        model_info = self.results.get("model_info") or {}
+        gof = self.results.get("goodness_of_fit") or {}
+        coeffs = self.results.get("coefficients") or []
         
         # === SECTION 1: Model Specification ===
         self._add_section_header(story, "Model Specification", styles)
-        self._add_key_value_pair(story, "Model Family", model_info.get('family', 'N/A'), styles)
-        self._add_key_value_pair(story, "Link Function", model_info.get('link', 'N/A'), styles)
-        self._add_key_value_pair(story, "Number of Observations", self._format_number(model_info.get('n_obs', 'N/A'), 0), styles)
-        self._add_key_value_pair(story, "Number of Features", len(self.results.get('coefficients', [])), styles)
+        self._add_key_value_table(story, [
+            ["Model Family", model_info.get('family', 'N/A')],
+            ["Link Function", model_info.get('link', 'N/A')],
+            ["Number of Observations", self._format_number(model_info.get('n_obs', 'N/A'), 0)],
+            ["Number of Features", len(coeffs)]
+        ])
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 2: Goodness of Fit ===
         self._add_section_header(story, "Goodness of Fit Metrics", styles)
-        self._add_key_value_pair(story, "AIC (Akaike Information Criterion)", self._format_number(gof.get('aic', 'N/A'), 2), styles)
-        self._add_key_value_pair(story, "BIC (Bayesian Information Criterion)", self._format_number(gof.get('bic', 'N/A'), 2), styles)
-        self._add_key_value_pair(story, "Deviance", self._format_number(gof.get('deviance', 'N/A'), 2), styles)
-        self._add_key_value_pair(story, "Pearson Chi-Square", self._format_number(gof.get('pearson_chi2', 'N/A'), 2), styles)
-        self._add_key_value_pair(story, "Degrees of Freedom", self._format_number(gof.get('df_resid', 'N/A'), 0), styles)
+        self._add_key_value_table(story, [
+            ["AIC (Akaike Information Criterion)", self._format_number(gof.get('aic', 'N/A'), 2)],
+            ["BIC (Bayesian Information Criterion)", self._format_number(gof.get('bic', 'N/A'), 2)],
+            ["Deviance", self._format_number(gof.get('deviance', 'N/A'), 2)],
+            ["Pearson Chi-Square", self._format_number(gof.get('pearson_chi2', 'N/A'), 2)],
+            ["Degrees of Freedom", self._format_number(gof.get('df_resid', 'N/A'), 0)]
+        ])
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 3: Model Coefficients ===
-        coeffs = self.results.get("coefficients", [])
         if coeffs:
             self._add_section_header(story, "Model Coefficients (Top 20)", styles)
             story.append(Paragraph(
@@ -617,6 +965,7 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             ))
             story.append(Spacer(1, 0.1*inch))
             
+            rows = []
             for coef in coeffs[:20]:
                 var = coef.get('variable', 'N/A')
                 coef_val = self._format_number(coef.get('coefficient', 'N/A'), 4)
@@ -624,8 +973,8 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
                 z_val = self._format_number(coef.get('z_value', 'N/A'), 3)
                 p_val = self._format_number(coef.get('p_value', 'N/A'), 4)
                 
-                text = f"<b>{var}:</b> β={coef_val}, SE={se}, z={z_val}, p={p_val}"
-                story.append(Paragraph(text, styles['Normal']))
+                rows.append([var, f"β={coef_val}, SE={se}, z={z_val}, p={p_val}"])
+            self._add_key_value_table(story, rows)
             
             if len(coeffs) > 20:
                 story.append(Paragraph(
@@ -644,10 +993,12 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             ))
             story.append(Spacer(1, 0.1*inch))
             
+            rows = []
             for i, feat in enumerate(feature_importance[:10], 1):
                 name = feat.get('feature', 'N/A')
                 importance = self._format_number(feat.get('importance', 'N/A'), 4)
-                self._add_key_value_pair(story, f"  {i}. {name}", importance, styles)
+                rows.append([f"  {i}. {name}", importance])
+            self._add_key_value_table(story, rows)
             
             story.append(Spacer(1, 0.15*inch))
         
@@ -655,36 +1006,47 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
         residuals = self.results.get("residuals", {})
         if residuals:
             self._add_section_header(story, "Residual Diagnostics", styles)
-            self._add_key_value_pair(story, "Mean Residual", self._format_number(residuals.get('mean', 'N/A'), 6), styles)
-            self._add_key_value_pair(story, "Std Dev of Residuals", self._format_number(residuals.get('std', 'N/A'), 4), styles)
-            self._add_key_value_pair(story, "Min Residual", self._format_number(residuals.get('min', 'N/A'), 4), styles)
-            self._add_key_value_pair(story, "Max Residual", self._format_number(residuals.get('max', 'N/A'), 4), styles)
+            self._add_key_value_table(story, [
+                ["Mean Residual", self._format_number(residuals.get('mean', 'N/A'), 6)],
+                ["Std Dev of Residuals", self._format_number(residuals.get('std', 'N/A'), 4)],
+                ["Min Residual", self._format_number(residuals.get('min', 'N/A'), 4)],
+                ["Max Residual", self._format_number(residuals.get('max', 'N/A'), 4)]
+            ])
     
     def _add_ml_survival_details_pdf(self, story: List, styles):
         """Add comprehensive ML survival analysis details to PDF."""
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
+        
+        results = self.results
+        var_importance = results.get("variable_importance") or []
         
         # === SECTION 1: Model Overview ===
         self._add_section_header(story, "Model Overview", styles)
-        self._add_key_value_pair(story, "Model Type", self.results.get('model_type', 'N/A'), styles)
-        self._add_key_value_pair(story, "Number of Features", len(self.results.get('variable_importance', [])), styles)
-        self._add_key_value_pair(story, "Training Samples", self._format_number(self.results.get('n_train', 'N/A'), 0), styles)
-        self._add_key_value_pair(story, "Test Samples", self._format_number(self.results.get('n_test', 'N/A'), 0), styles)
+        self._add_key_value_table(story, [
+            ["Model Type", results.get('model_type', 'N/A')],
+            ["Number of Features", len(var_importance)],
+            ["Training Samples", self._format_number(results.get('n_train', 'N/A'), 0)],
+            ["Test Samples", self._format_number(results.get('n_test', 'N/A'), 0)]
+        ])
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 2: Performance Metrics ===
         self._add_section_header(story, "Model Performance", styles)
-        self._add_key_value_pair(story, "Training C-Index", self._format_number(self.results.get('train_c_index', 'N/A'), 3), styles)
-        self._add_key_value_pair(story, "Test C-Index", self._format_number(self.results.get('test_c_index', 'N/A'), 3), styles)
+        rows = [
+            ["Training C-Index", self._format_number(results.get('train_c_index', 'N/A'), 3)],
+            ["Test C-Index", self._format_number(results.get('test_c_index', 'N/A'), 3)]
+        ]
         
         # Cross-validation if available
-        cv_score = self.results.get('cv_score', 'N/A')
+        cv_score = results.get('cv_score', 'N/A')
         if cv_score != 'N/A':
-            self._add_key_value_pair(story, "Cross-Validation C-Index", self._format_number(cv_score, 3), styles)
+            rows.append(["Cross-Validation C-Index", self._format_number(cv_score, 3)])
         
+        self._add_key_value_table(story, rows)
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 3: Variable Importance ===
-        var_importance = self.results.get("variable_importance", [])
         if var_importance:
             self._add_section_header(story, "Variable Importance Rankings", styles)
             story.append(Paragraph(
@@ -693,10 +1055,11 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             ))
             story.append(Spacer(1, 0.1*inch))
             
-            for i, var in enumerate(var_importance[:20], 1):
-                feat_name = var.get('feature', 'N/A')
-                importance = self._format_number(var.get('importance', 'N/A'), 4)
-                self._add_key_value_pair(story, f"  {i}. {feat_name}", importance, styles)
+            rows = [
+                [f"{i}. {var.get('feature', 'N/A')}", self._format_number(var.get('importance', 'N/A'), 4)]
+                for i, var in enumerate(var_importance[:20], 1)
+            ]
+            self._add_key_value_table(story, rows)
             
             if len(var_importance) > 20:
                 story.append(Paragraph(
@@ -706,7 +1069,7 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 4: Model Comparison ===
-        comparison = self.results.get("comparison", {})
+        comparison = results.get("comparison", {})
         if comparison:
             self._add_section_header(story, "Model Comparison", styles)
             story.append(Paragraph(
@@ -715,14 +1078,16 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             ))
             story.append(Spacer(1, 0.1*inch))
             
+            rows = []
             for model_name, metrics in comparison.items():
                 c_index = self._format_number(metrics.get('c_index', 'N/A'), 3)
-                self._add_key_value_pair(story, f"  {model_name}", f"C-Index: {c_index}", styles)
+                rows.append([f"  {model_name}", f"C-Index: {c_index}"])
+            self._add_key_value_table(story, rows)
             
             story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 5: Risk Stratification ===
-        risk_groups = self.results.get("risk_stratification", {})
+        risk_groups = results.get("risk_stratification", {})
         if risk_groups:
             self._add_section_header(story, "Risk Stratification", styles)
             story.append(Paragraph(
@@ -731,13 +1096,18 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             ))
             story.append(Spacer(1, 0.1*inch))
             
+            rows = []
             for group_name, group_data in risk_groups.items():
                 n_patients = self._format_number(group_data.get('n_patients', 'N/A'), 0)
                 median_surv = self._format_number(group_data.get('median_survival', 'N/A'), 2)
-                self._add_key_value_pair(story, f"  {group_name}", f"N={n_patients}, Median={median_surv}", styles)
+                rows.append([f"  {group_name}", f"N={n_patients}, Median={median_surv}"])
+            self._add_key_value_table(story, rows)
     
     def _add_mortality_details_pdf(self, story: List, styles):
         """Add comprehensive mortality analysis details to PDF."""
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
+        
         kpis = self.results.get("kpis", {})
         
         # === SECTION 1: Key Performance Indicators ===
@@ -752,10 +1122,12 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
         peak_rate = kpis.get('peak_mortality_rate', 'N/A')
         peak_rate_str = self._format_number(peak_rate, 6)
         
-        self._add_key_value_pair(story, "Life Expectancy at Birth", f"{life_exp_str} years", styles)
-        self._add_key_value_pair(story, "Maximum Age", max_age, styles)
-        self._add_key_value_pair(story, "Age at Peak Mortality", peak_age, styles)
-        self._add_key_value_pair(story, "Peak Mortality Rate", peak_rate_str, styles)
+        self._add_key_value_table(story, [
+            ["Life Expectancy at Birth", f"{life_exp_str} years"],
+            ["Maximum Age", max_age],
+            ["Age at Peak Mortality", peak_age],
+            ["Peak Mortality Rate", peak_rate_str]
+        ])
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 2: Life Table ===
@@ -769,7 +1141,7 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             story.append(Spacer(1, 0.1*inch))
             
             # Create life table
-            table_columns = ['Age', 'qx', 'lx', 'dx', 'ex']
+            table_columns = ['age', 'qx', 'lx', 'dx', 'ex']
             table = self._create_pdf_table(life_table, table_columns, max_rows=20)
             if table:
                 story.append(table)
@@ -794,27 +1166,33 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             whittaker = graduated.get("whittaker", {})
             if whittaker:
                 story.append(Paragraph("<b>Whittaker-Henderson Graduation:</b>", styles['Normal']))
-                self._add_key_value_pair(story, "  Lambda Parameter", self._format_number(whittaker.get('lambda', 'N/A'), 2), styles)
-                self._add_key_value_pair(story, "  R² Score", self._format_number(whittaker.get('r2_score', 'N/A'), 4), styles)
-                self._add_key_value_pair(story, "  RMSE", self._format_number(whittaker.get('rmse', 'N/A'), 6), styles)
+                self._add_key_value_table(story, [
+                    ["  Lambda Parameter", self._format_number(whittaker.get('lambda', 'N/A'), 2)],
+                    ["  R² Score", self._format_number(whittaker.get('r2_score', 'N/A'), 4)],
+                    ["  RMSE", self._format_number(whittaker.get('rmse', 'N/A'), 6)]
+                ])
                 story.append(Spacer(1, 0.05*inch))
             
             # Moving Average
             moving_avg = graduated.get("moving_average", {})
             if moving_avg:
                 story.append(Paragraph("<b>Moving Average Graduation:</b>", styles['Normal']))
-                self._add_key_value_pair(story, "  Window Size", moving_avg.get('window_size', 'N/A'), styles)
-                self._add_key_value_pair(story, "  R² Score", self._format_number(moving_avg.get('r2_score', 'N/A'), 4), styles)
-                self._add_key_value_pair(story, "  RMSE", self._format_number(moving_avg.get('rmse', 'N/A'), 6), styles)
+                self._add_key_value_table(story, [
+                    ["  Window Size", moving_avg.get('window_size', 'N/A')],
+                    ["  R² Score", self._format_number(moving_avg.get('r2_score', 'N/A'), 4)],
+                    ["  RMSE", self._format_number(moving_avg.get('rmse', 'N/A'), 6)]
+                ])
                 story.append(Spacer(1, 0.05*inch))
             
             # Spline
             spline = graduated.get("spline", {})
             if spline:
                 story.append(Paragraph("<b>Spline Graduation:</b>", styles['Normal']))
-                self._add_key_value_pair(story, "  Smoothing Factor", self._format_number(spline.get('smoothing_factor', 'N/A'), 2), styles)
-                self._add_key_value_pair(story, "  R² Score", self._format_number(spline.get('r2_score', 'N/A'), 4), styles)
-                self._add_key_value_pair(story, "  RMSE", self._format_number(spline.get('rmse', 'N/A'), 6), styles)
+                self._add_key_value_table(story, [
+                    ["  Smoothing Factor", self._format_number(spline.get('smoothing_factor', 'N/A'), 2)],
+                    ["  R² Score", self._format_number(spline.get('r2_score', 'N/A'), 4)],
+                    ["  RMSE", self._format_number(spline.get('rmse', 'N/A'), 6)]
+                ])
             
             story.append(Spacer(1, 0.15*inch))
         
@@ -828,10 +1206,12 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             if gompertz:
                 story.append(Paragraph("<b>Gompertz Model: μₓ = B·exp(c·x)</b>", styles['Normal']))
                 params = gompertz.get('parameters', {})
-                self._add_key_value_pair(story, "  Parameter B", self._format_number(params.get('B', 'N/A'), 6), styles)
-                self._add_key_value_pair(story, "  Parameter c", self._format_number(params.get('c', 'N/A'), 6), styles)
-                self._add_key_value_pair(story, "  R² Score", self._format_number(gompertz.get('r2_score', 'N/A'), 4), styles)
-                self._add_key_value_pair(story, "  RMSE", self._format_number(gompertz.get('rmse', 'N/A'), 6), styles)
+                self._add_key_value_table(story, [
+                    ["  Parameter B", self._format_number(params.get('B', 'N/A'), 6)],
+                    ["  Parameter c", self._format_number(params.get('c', 'N/A'), 6)],
+                    ["  R² Score", self._format_number(gompertz.get('r2_score', 'N/A'), 4)],
+                    ["  RMSE", self._format_number(gompertz.get('rmse', 'N/A'), 6)]
+                ])
                 story.append(Spacer(1, 0.05*inch))
             
             # Makeham Model
@@ -839,11 +1219,13 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             if makeham:
                 story.append(Paragraph("<b>Makeham Model: μₓ = A + B·exp(c·x)</b>", styles['Normal']))
                 params = makeham.get('parameters', {})
-                self._add_key_value_pair(story, "  Parameter A", self._format_number(params.get('A', 'N/A'), 6), styles)
-                self._add_key_value_pair(story, "  Parameter B", self._format_number(params.get('B', 'N/A'), 6), styles)
-                self._add_key_value_pair(story, "  Parameter c", self._format_number(params.get('c', 'N/A'), 6), styles)
-                self._add_key_value_pair(story, "  R² Score", self._format_number(makeham.get('r2_score', 'N/A'), 4), styles)
-                self._add_key_value_pair(story, "  RMSE", self._format_number(makeham.get('rmse', 'N/A'), 6), styles)
+                self._add_key_value_table(story, [
+                    ["  Parameter A", self._format_number(params.get('A', 'N/A'), 6)],
+                    ["  Parameter B", self._format_number(params.get('B', 'N/A'), 6)],
+                    ["  Parameter c", self._format_number(params.get('c', 'N/A'), 6)],
+                    ["  R² Score", self._format_number(makeham.get('r2_score', 'N/A'), 4)],
+                    ["  RMSE", self._format_number(makeham.get('rmse', 'N/A'), 6)]
+                ])
             
             story.append(Spacer(1, 0.15*inch))
         
@@ -858,11 +1240,21 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             
             # Select key ages
             key_ages = [0, 20, 40, 60, 80]
+            # Index rows by age once (first row wins for a repeated age); keys are
+            # cast to int so NumPy scalars and numeric strings match the key ages too
+            age_index = {}
+            for row in reversed(life_table):
+                try:
+                    age_index[int(row['age'])] = row
+                except (TypeError, ValueError):
+                    continue
+            rows = []
             for age in key_ages:
-                age_data = next((row for row in life_table if row.get('Age') == age), None)
+                age_data = age_index.get(age)
                 if age_data:
                     ex = self._format_number(age_data.get('ex', 'N/A'), 2)
-                    self._add_key_value_pair(story, f"  Life Expectancy at Age {age}", f"{ex} years", styles)
+                    rows.append([f"Life Expectancy at Age {age}", f"{ex} years"])
+            self._add_key_value_table(story, rows)
             
             story.append(Spacer(1, 0.15*inch))
         
@@ -875,42 +1267,56 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             qx_values = raw_data.get('qx', [])
             
             if ages and qx_values:
-                # Find minimum mortality
-                min_qx = min(qx_values) if qx_values else 'N/A'
-                min_age = ages[qx_values.index(min_qx)] if qx_values and min_qx != 'N/A' else 'N/A'
+                ages_arr = np.asarray(ages)
+                qx_arr = np.asarray(qx_values, dtype=np.float64)
                 
-                self._add_key_value_pair(story, "Minimum Mortality Rate", self._format_number(min_qx, 6), styles)
-                self._add_key_value_pair(story, "Age at Minimum Mortality", min_age, styles)
-                self._add_key_value_pair(story, "Age Range", f"{min(ages)} - {max(ages)}", styles)
-                self._add_key_value_pair(story, "Number of Age Points", len(ages), styles)
+                # Find minimum mortality (and its age) in one pass
+                min_idx = int(np.argmin(qx_arr))
+                min_qx = float(qx_arr[min_idx])
+                min_age = ages[min_idx]
+                
+                self._add_key_value_table(story, [
+                    ["Minimum Mortality Rate", self._format_number(min_qx, 6)],
+                    ["Age at Minimum Mortality", min_age],
+                    ["Age Range", f"{ages_arr.min()} - {ages_arr.max()}"],
+                    ["Number of Age Points", len(ages)]
+                ])
         
     
     def _add_timeseries_details_pdf(self, story: List, styles):
         """Add comprehensive time-series analysis details to PDF."""
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Paragraph, Spacer
+        
         metrics = self.results.get("metrics", {})
         forecast = self.results.get("forecast", {})
         
         # === SECTION 1: Model Information ===
         self._add_section_header(story, "Model Information", styles)
-        self._add_key_value_pair(story, "Model Type", self.results.get('model_type', 'N/A'), styles)
-        self._add_key_value_pair(story, "Forecast Periods", len(forecast.get('dates', [])), styles)
+        rows = [
+            ["Model Type", self.results.get('model_type', 'N/A')],
+            ["Forecast Periods", len(forecast.get('dates', []))]
+        ]
         
         # ARIMA parameters if available
         params = self.results.get('model_parameters', {})
         if params:
             if 'p' in params:
-                self._add_key_value_pair(story, "ARIMA Order (p,d,q)", f"({params.get('p')}, {params.get('d')}, {params.get('q')})", styles)
+                rows.append(["ARIMA Order (p,d,q)", f"({params.get('p')}, {params.get('d')}, {params.get('q')})"])
             if 'seasonal_order' in params:
-                self._add_key_value_pair(story, "Seasonal Order", str(params.get('seasonal_order')), styles)
+                rows.append(["Seasonal Order", str(params.get('seasonal_order'))])
         
+        self._add_key_value_table(story, rows)
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 2: Forecast Accuracy ===
         self._add_section_header(story, "Forecast Accuracy Metrics", styles)
-        self._add_key_value_pair(story, "MAE (Mean Absolute Error)", self._format_number(metrics.get('mae', 'N/A'), 2), styles)
-        self._add_key_value_pair(story, "RMSE (Root Mean Squared Error)", self._format_number(metrics.get('rmse', 'N/A'), 2), styles)
-        self._add_key_value_pair(story, "MAPE (Mean Absolute Percentage Error)", f"{self._format_number(metrics.get('mape', 'N/A'), 2)}%", styles)
-        self._add_key_value_pair(story, "R² Score", self._format_number(metrics.get('r2', 'N/A'), 4), styles)
+        self._add_key_value_table(story, [
+            ["MAE (Mean Absolute Error)", self._format_number(metrics.get('mae', 'N/A'), 2)],
+            ["RMSE (Root Mean Squared Error)", self._format_number(metrics.get('rmse', 'N/A'), 2)],
+            ["MAPE (Mean Absolute Percentage Error)", f"{self._format_number(metrics.get('mape', 'N/A'), 2)}%"],
+            ["R² Score", self._format_number(metrics.get('r2', 'N/A'), 4)]
+        ])
         story.append(Spacer(1, 0.15*inch))
         
         # === SECTION 3: Forecast Summary ===
@@ -919,18 +1325,22 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             forecast_vals = forecast.get('values', [])
             
             if forecast_vals:
-                self._add_key_value_pair(story, "Mean Forecast Value", self._format_number(sum(forecast_vals)/len(forecast_vals), 2), styles)
-                self._add_key_value_pair(story, "Min Forecast Value", self._format_number(min(forecast_vals), 2), styles)
-                self._add_key_value_pair(story, "Max Forecast Value", self._format_number(max(forecast_vals), 2), styles)
+                values = np.asarray(forecast_vals, dtype=np.float64)
+                self._add_key_value_table(story, [
+                    ["Mean Forecast Value", self._format_number(float(values.mean()), 2)],
+                    ["Min Forecast Value", self._format_number(float(values.min()), 2)],
+                    ["Max Forecast Value", self._format_number(float(values.max()), 2)]
+                ])
             
             # Show first few forecast points
             story.append(Spacer(1, 0.1*inch))
             story.append(Paragraph("<b>First 10 Forecast Points:</b>", styles['Normal']))
             dates = forecast.get('dates', [])
+            rows = []
             for i in range(min(10, len(forecast_vals))):
                 date_str = dates[i] if i < len(dates) else f"Period {i+1}"
-                val = self._format_number(forecast_vals[i], 2)
-                self._add_key_value_pair(story, f"  {date_str}", val, styles)
+                rows.append([date_str, self._format_number(forecast_vals[i], 2)])
+            self._add_key_value_table(story, rows)
             
             story.append(Spacer(1, 0.15*inch))
         
@@ -947,24 +1357,34 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             trend_strength = self._format_number(decomposition.get('trend_strength', 'N/A'), 3)
             seasonal_strength = self._format_number(decomposition.get('seasonal_strength', 'N/A'), 3)
             
-            self._add_key_value_pair(story, "Trend Strength", trend_strength, styles)
-            self._add_key_value_pair(story, "Seasonal Strength", seasonal_strength, styles)
-            self._add_key_value_pair(story, "Seasonal Period", decomposition.get('period', 'N/A'), styles)
+            self._add_key_value_table(story, [
+                ["Trend Strength", trend_strength],
+                ["Seasonal Strength", seasonal_strength],
+                ["Seasonal Period", decomposition.get('period', 'N/A')]
+            ])
     
     def _add_chainladder_details_pdf(self, story: List, styles):
         """Add chain-ladder analysis details to PDF."""
-        details = f"""
-        <b>Reserve Estimate:</b> ${self.results.get('reserve_estimate', 'N/A'):,.2f}<br/>
-        <b>Number of Origin Periods:</b> {self.results.get('n_origin', 'N/A')}<br/>
-        <b>Number of Development Periods:</b> {self.results.get('n_dev', 'N/A')}<br/>
-        <b>Development Factors:</b> {', '.join([f'{x:.3f}' for x in self.results.get('development_factors', [])])}
-        """
-        story.append(Paragraph(details, styles['Normal']))
+        reserve = self.results.get('reserve_estimate')
+        reserve_str = f"${reserve:,.2f}" if isinstance(reserve, (int, float)) else 'N/A'
+        
+        # Long factor lists are cut off to keep the row a manageable size
+        dev_factors = list(self.results.get('development_factors', []))
+        factors_str = ', '.join(map('{:.3f}'.format, dev_factors[:50]))
+        if len(dev_factors) > 50:
+            factors_str += ', …'
+        
+        self._add_key_value_table(story, [
+            ["Reserve Estimate", reserve_str],
+            ["Number of Origin Periods", self.results.get('n_origin', 'N/A')],
+            ["Number of Development Periods", self.results.get('n_dev', 'N/A')],
+            ["Development Factors", factors_str]
+        ])
     
     def _generate_word_report(self) -> str:
         """Generate Word document report using python-docx."""
-        filename = f"{self.analysis_type}_report_{self.dataset_id}_{self.timestamp.strftime('%Y%m%d_%H%M%S')}.docx"
-        filepath = self.report_dir / filename
+        from docx import Document
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
         
         # Create Word document
         doc = Document()
@@ -976,30 +1396,33 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
         # Metadata
         doc.add_paragraph(f"Dataset: {self.dataset_id}")
         doc.add_paragraph(f"Analysis Type: {self.analysis_type.title()}")
-        doc.add_paragraph(f"Generated: {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
+        doc.add_paragraph(f"Generated: {self.ts_display}")
         doc.add_paragraph(f"Platform: ADaaS (Actuarial Data Analysis as a Service)")
         doc.add_paragraph()
         
-        # Generate AI insights
-        insights = self._generate_ai_insights()
+        # Request AI insights in the background and write the detailed results meanwhile;
+        # the insight sections are then inserted ahead of them
+        insights_future = _get_insight_executor().submit(self._generate_ai_insights)
+        
+        # Detailed Results
+        details_heading = doc.add_heading("Detailed Results", 1)
+        self._add_detailed_results_to_word(doc)
+        
+        insights = insights_future.result()
         
         # Executive Summary
-        doc.add_heading("Executive Summary", 1)
-        doc.add_paragraph(insights["executive_summary"])
+        details_heading.insert_paragraph_before("Executive Summary", style='Heading 1')
+        details_heading.insert_paragraph_before(insights["executive_summary"])
         
         # Key Insights
-        doc.add_heading("Key Insights", 1)
+        details_heading.insert_paragraph_before("Key Insights", style='Heading 1')
         for insight in insights["key_insights"]:
-            doc.add_paragraph(insight, style='List Bullet')
+            details_heading.insert_paragraph_before(insight, style='List Bullet')
         
         # Model Performance
         if insights.get("model_performance"):
-            doc.add_heading("Model Performance", 1)
-            doc.add_paragraph(insights["model_performance"])
-        
-        # Detailed Results
-        doc.add_heading("Detailed Results", 1)
-        self._add_detailed_results_to_word(doc)
+            details_heading.insert_paragraph_before("Model Performance", style='Heading 1')
+            details_heading.insert_paragraph_before(insights["model_performance"])
         
         # Business Implications
         doc.add_heading("Business Implications", 1)
@@ -1012,9 +1435,60 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             doc.add_paragraph(limitation, style='List Bullet')
         
         # Save document
-        doc.save(str(filepath))
+        return self._write_report(self._output_path("docx"), doc.save)
+    
+    def _add_kv_table_word(self, doc, rows: List[List[str]]):
+        """
+        Add key-value rows to a Word document as one two-column table.
         
-        return str(filepath)
+        The table XML is assembled directly and inserted in a single step,
+        which is cheaper than a paragraph per row or python-docx's add_table
+        with per-cell text assignment.
+        """
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+        
+        if not rows:
+            return
+        
+        tbl = OxmlElement('w:tbl')
+        tbl_pr = OxmlElement('w:tblPr')
+        tbl_style = OxmlElement('w:tblStyle')
+        tbl_style.set(qn('w:val'), 'TableGrid')
+        tbl_pr.append(tbl_style)
+        tbl_width = OxmlElement('w:tblW')
+        tbl_width.set(qn('w:w'), '0')
+        tbl_width.set(qn('w:type'), 'auto')
+        tbl_pr.append(tbl_width)
+        tbl.append(tbl_pr)
+        
+        grid = OxmlElement('w:tblGrid')
+        grid.append(OxmlElement('w:gridCol'))
+        grid.append(OxmlElement('w:gridCol'))
+        tbl.append(grid)
+        
+        for key, value in rows:
+            tr = OxmlElement('w:tr')
+            for text in (key, value):
+                t = OxmlElement('w:t')
+                t.set(qn('xml:space'), 'preserve')
+                t.text = str(text)
+                r = OxmlElement('w:r')
+                r.append(t)
+                p = OxmlElement('w:p')
+                p.append(r)
+                tc = OxmlElement('w:tc')
+                tc.append(p)
+                tr.append(tc)
+            tbl.append(tr)
+        
+        # Keep the section properties as the last child of the body
+        body = doc.element.body
+        sect_pr = body.find(qn('w:sectPr'))
+        if sect_pr is not None:
+            sect_pr.addprevious(tbl)
+        else:
+            body.append(tbl)
     
     def _add_detailed_results_to_word(self, doc):
         """Add analysis-specific detailed results to Word document."""
@@ -1063,11 +1537,13 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
             doc.add_paragraph()
             doc.add_paragraph("Model Coefficients (Top 10):", style='Heading 3')
             coeffs = self.results["coefficients"][:10]
+            rows = []
             for coef in coeffs:
                 var = coef.get('variable', 'N/A')
                 coef_val = self._format_number(coef.get('coefficient', 'N/A'), 4)
                 p_val = self._format_number(coef.get('p_value', 'N/A'), 4)
-                doc.add_paragraph(f"{var}: {coef_val} (p={p_val})")
+                rows.append([var, f"{coef_val} (p={p_val})"])
+            self._add_kv_table_word(doc, rows)
     
     def _add_ml_survival_details_word(self, doc):
         """Add ML survival analysis details to Word document."""
@@ -1082,10 +1558,11 @@ Format your response as JSON with keys: executive_summary, key_insights (array),
         if "variable_importance" in self.results:
             doc.add_paragraph()
             doc.add_paragraph("Top Features by Importance:", style='Heading 3')
-            for var in self.results["variable_importance"][:10]:
-                feat = var.get('feature', 'N/A')
-                importance = self._format_number(var.get('importance', 'N/A'), 4)
-                doc.add_paragraph(f"{feat}: {importance}")
+            rows = [
+                [var.get('feature', 'N/A'), self._format_number(var.get('importance', 'N/A'), 4)]
+                for var in self.results["variable_importance"][:10]
+            ]
+            self._add_kv_table_word(doc, rows)
     
     def _add_mortality_details_word(self, doc):
         """Add mortality analysis details to Word document."""
@@ -1140,7 +1617,8 @@ def generate_analysis_report(
     analysis_type: str,
     results: Dict[str, Any],
     dataset_id: str,
-    format: str = "pdf"
+    format: str = "pdf",
+    force: bool = False
 ) -> str:
     """
     Convenience function to generate analysis report.
@@ -1150,9 +1628,37 @@ def generate_analysis_report(
         results: Analysis results dictionary
         dataset_id: Dataset identifier
         format: Report format ('pdf' or 'docx')
+        force: Rebuild even if a report for identical results already exists
+        
+    Returns:
+        Path to generated report file
+    """
+    generator = ReportGenerator(analysis_type, results, dataset_id)
+    return generator.generate_report(format, force)
+
+
+async def generate_analysis_report_async(
+    analysis_type: str,
+    results: Dict[str, Any],
+    dataset_id: str,
+    format: str = "pdf",
+    force: bool = False
+) -> str:
+    """
+    Async variant of generate_analysis_report for use from the API event loop.
+    
+    The report is built in a worker thread, so the event loop keeps serving
+    other requests while ReportLab or python-docx lays it out.
+    
+    Args:
+        analysis_type: Type of analysis
+        results: Analysis results dictionary
+        dataset_id: Dataset identifier
+        format: Report format ('pdf' or 'docx')
+        force: Rebuild even if a report for identical results already exists
         
     Returns:
         Path to generated report file
     """
     generator = ReportGenerator(analysis_type, results, dataset_id)
-    return generator.generate_report(format)
+    return await asyncio.to_thread(generator.generate_report, format, force)
@@ -1,7 +1,7 @@
 """Chain-ladder reserving models for claims triangles."""
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 
 def run_chain_ladder_from_csv(csv_path: str) -> Dict[str, Any]:
@@ -38,12 +38,14 @@ def run_chain_ladder_from_csv(csv_path: str) -> Dict[str, Any]:
     # Compute development factors
     dev_factors = compute_development_factors(triangle)
     
+    # Latest diagonal, found once and shared by the projection and the reserve
+    latest_age, latest_diagonal = _latest_observed(triangle.to_numpy(dtype=np.float64))
+    
     # Project ultimate values
-    ultimate = project_ultimate(triangle, dev_factors)
+    ultimate = latest_diagonal * _remaining_factors(dev_factors, n_dev)[latest_age]
     
     # Compute reserve estimate
     # Reserve = Ultimate - Latest Diagonal
-    latest_diagonal = get_latest_diagonal(triangle)
     reserve_estimate = float((ultimate - latest_diagonal).sum())
     
     return {
@@ -66,31 +68,19 @@ def compute_development_factors(triangle: pd.DataFrame) -> list:
     Returns:
         List of development factors (length = n_dev - 1)
     """
-    dev_factors = []
-    n_dev = len(triangle.columns)
+    values = triangle.to_numpy(dtype=np.float64)
+    current, following = values[:, :-1], values[:, 1:]
     
-    for i in range(n_dev - 1):
-        col_current = triangle.columns[i]
-        col_next = triangle.columns[i + 1]
-        
-        # Get valid pairs (both non-null)
-        valid_mask = triangle[col_current].notna() & triangle[col_next].notna()
-        
-        if valid_mask.sum() == 0:
-            # No valid pairs, use 1.0 as default
-            dev_factors.append(1.0)
-            continue
-        
-        sum_current = triangle.loc[valid_mask, col_current].sum()
-        sum_next = triangle.loc[valid_mask, col_next].sum()
-        
-        if sum_current == 0:
-            dev_factors.append(1.0)
-        else:
-            factor = sum_next / sum_current
-            dev_factors.append(float(factor))
+    # Get valid pairs (both non-null) for every development period at once
+    valid_mask = ~np.isnan(current) & ~np.isnan(following)
+    sum_current = np.where(valid_mask, current, 0.0).sum(axis=0)
+    sum_next = np.where(valid_mask, following, 0.0).sum(axis=0)
+    
+    # No valid pairs (or zero volume), use 1.0 as default
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dev_factors = np.where(sum_current != 0, sum_next / sum_current, 1.0)
     
-    return dev_factors
+    return dev_factors.tolist()
 
 
 def project_ultimate(triangle: pd.DataFrame, dev_factors: list) -> pd.Series:
@@ -104,32 +94,13 @@ def project_ultimate(triangle: pd.DataFrame, dev_factors: list) -> pd.Series:
     Returns:
         Series of ultimate values indexed by origin year
     """
-    n_dev = len(triangle.columns)
-    ultimate = pd.Series(index=triangle.index, dtype=float)
+    values = triangle.to_numpy(dtype=np.float64)
+    latest_age, latest_value = _latest_observed(values)
     
-    for idx, row in triangle.iterrows():
-        # Find latest non-null value
-        latest_value = None
-        latest_age = None
-        
-        for age in range(n_dev - 1, -1, -1):
-            if pd.notna(row.iloc[age]):
-                latest_value = row.iloc[age]
-                latest_age = age
-                break
-        
-        if latest_value is None:
-            ultimate[idx] = 0.0
-            continue
-        
-        # Project to ultimate using remaining factors
-        projected = latest_value
-        for age in range(latest_age, n_dev - 1):
-            projected *= dev_factors[age]
-        
-        ultimate[idx] = projected
+    # Project to ultimate using remaining factors; origins with no data stay at 0.0
+    projected = latest_value * _remaining_factors(dev_factors, values.shape[1])[latest_age]
     
-    return ultimate
+    return pd.Series(projected, index=triangle.index, dtype=float)
 
 
 def get_latest_diagonal(triangle: pd.DataFrame) -> pd.Series:
@@ -142,16 +113,38 @@ def get_latest_diagonal(triangle: pd.DataFrame) -> pd.Series:
     Returns:
         Series of latest values indexed by origin year
     """
-    latest = pd.Series(index=triangle.index, dtype=float)
-    
-    for idx, row in triangle.iterrows():
-        # Find latest non-null value
-        for age in range(len(row) - 1, -1, -1):
-            if pd.notna(row.iloc[age]):
-                latest[idx] = row.iloc[age]
-                break
+    _, latest_value = _latest_observed(triangle.to_numpy(dtype=np.float64))
+    return pd.Series(latest_value, index=triangle.index, dtype=float)
+
+
+def _latest_observed(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate the latest non-null value in each row of a triangle.
+    
+    Args:
+        values: 2-D float array, origins by development periods
         
-        if pd.isna(latest[idx]):
-            latest[idx] = 0.0
+    Returns:
+        Tuple of (latest development age, latest value) per origin; origins
+        with no data get age -1 and value 0.0
+    """
+    observed = ~np.isnan(values)
+    has_data = observed.any(axis=1)
+    last = values.shape[1] - 1
+    
+    latest_age = np.where(has_data, last - observed[:, ::-1].argmax(axis=1), -1)
+    latest_value = np.where(has_data, values[np.arange(len(values)), latest_age], 0.0)
     
-    return latest
+    return latest_age, latest_value
+
+
+def _remaining_factors(dev_factors: list, n_dev: int) -> np.ndarray:
+    """
+    Cumulative development factor from each age to ultimate.
+    
+    Entry k is the product of dev_factors[k:]; the last entry is 1.0, so an
+    age of -1 (no data) also maps to 1.0.
+    """
+    remaining = np.ones(n_dev)
+    remaining[:-1] = np.cumprod(np.asarray(dev_factors, dtype=np.float64)[:n_dev - 1][::-1])[::-1]
+    return remaining
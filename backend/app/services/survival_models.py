@@ -149,29 +149,28 @@ def compute_life_table(time: pd.Series, event: pd.Series) -> List[Dict]:
     Returns:
         List of dictionaries with time, at_risk, observed, censored
     """
-    df = pd.DataFrame({'time': time, 'event': event})
-    df = df.sort_values('time')
-    
-    unique_times = sorted(df['time'].unique())
-    life_table = []
-    
-    n_at_risk = len(df)
-    
-    for t in unique_times:
-        events_at_t = df[(df['time'] == t) & (df['event'] == 1)]
-        censored_at_t = df[(df['time'] == t) & (df['event'] == 0)]
-        
-        n_events = len(events_at_t)
-        n_censored = len(censored_at_t)
-        
-        life_table.append({
-            "time": float(t),
-            "at_risk": n_at_risk,
-            "observed": n_events,
-            "censored": n_censored
-        })
-        
-        n_at_risk -= (n_events + n_censored)
+    t = np.asarray(time, dtype=float)
+    e = np.asarray(event, dtype=float)
+    
+    # One pass over the rows: np.unique sorts the times and maps every row
+    # to its time point, bincount then tallies events/censorings per point
+    unique_times, inverse = np.unique(t, return_inverse=True)
+    n_events = np.bincount(inverse, weights=(e == 1), minlength=len(unique_times)).astype(int)
+    n_censored = np.bincount(inverse, weights=(e == 0), minlength=len(unique_times)).astype(int)
+    
+    # Subjects leave the risk set once they have an event or are censored
+    removed = n_events + n_censored
+    at_risk = len(t) - np.concatenate(([0], np.cumsum(removed)[:-1]))
+    
+    life_table = [
+        {
+            "time": float(time_point),
+            "at_risk": int(n_risk),
+            "observed": int(n_obs),
+            "censored": int(n_cens)
+        }
+        for time_point, n_risk, n_obs, n_cens in zip(unique_times, at_risk, n_events, n_censored)
+    ]
     
     return life_table
 
@@ -0,0 +1,49 @@
+"""CSV loading shared by the analysis services."""
+import datetime
+
+import pandas as pd
+
+# PyArrow CSV parser (multi-threaded)
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+def load_csv(csv_path: str) -> pd.DataFrame:
+    """
+    Load a CSV file, using the multi-threaded pyarrow parser when available.
+    
+    pyarrow turns ISO-8601 date, time and timestamp columns into date/datetime
+    values, where the default parser leaves them as text. Those columns are
+    read again as text, so callers see the same values as with the default
+    parser.
+    
+    Args:
+        csv_path: Path to the CSV file
+    
+    Returns:
+        DataFrame with the file contents
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(csv_path)
+    
+    df = pd.read_csv(csv_path, engine='pyarrow')
+    
+    date_cols = []
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            date_cols.append(col)
+        elif values.dtype == object:
+            first = values.first_valid_index()
+            if first is not None and isinstance(values[first], (datetime.date, datetime.time)):
+                date_cols.append(col)
+    
+    if date_cols:
+        text = pd.read_csv(csv_path, usecols=date_cols, dtype=str)
+        for col in date_cols:
+            df[col] = text[col]
+    
+    return df
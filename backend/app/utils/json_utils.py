@@ -0,0 +1,62 @@
+"""JSON encoding shared by the services, using orjson when it is installed."""
+import json
+import re
+from typing import Any
+
+# Faster JSON encoding/decoding
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# JSON object inside an optional ```json markdown fence
+JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize to indented JSON with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            default=str
+        ).decode()
+    return json.dumps(obj, indent=2, default=str)
+
+
+def dumps_sorted(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes with sorted keys, e.g. for content hashes."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                obj,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                default=str
+            )
+        except TypeError:  # e.g. integers wider than 64 bits
+            pass
+    return json.dumps(obj, sort_keys=True, default=str).encode()
+
+
+def loads(text: str) -> Any:
+    """Parse JSON with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON object in a model response.
+    
+    The object may be wrapped in a ```json markdown fence or returned bare.
+    
+    Args:
+        text: Raw response text
+    
+    Returns:
+        The parsed JSON value
+    """
+    match = JSON_FENCE.search(text)
+    return loads(match.group(1) if match else text.strip())
@@ -0,0 +1,7 @@
+"""Shared pytest configuration for the backend tests."""
+
+import sys
+from pathlib import Path
+
+# Make the `app` package importable when pytest is run from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
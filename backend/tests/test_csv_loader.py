@@ -0,0 +1,29 @@
+"""Tests for the shared CSV loader."""
+
+import pandas as pd
+import pytest
+
+from app.utils import csv_loader
+from app.utils.csv_loader import load_csv
+
+
+@pytest.mark.parametrize("pyarrow_engine", [True, False])
+def test_load_csv_keeps_date_columns_as_text(tmp_path, monkeypatch, pyarrow_engine):
+    if pyarrow_engine:
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(csv_loader, "PYARROW_AVAILABLE", pyarrow_engine)
+    csv_path = tmp_path / "policies.csv"
+    csv_path.write_text(
+        "time,event,issue_date,valued_at,cutoff,amount\n"
+        "5.0,1,2024-01-05,2024-01-05 10:00,08:30:00,100.0\n"
+        "7.5,0,2024-02-05,2024-01-06T11:30:00,09:15:00,250.0\n"
+        "2.0,1,,2024-01-07 00:00:00,10:00:00,75.0\n"
+    )
+
+    df = load_csv(str(csv_path))
+
+    expected = pd.read_csv(csv_path)
+    for col in ["issue_date", "valued_at", "cutoff"]:
+        pd.testing.assert_series_equal(df[col], expected[col])
+    assert df["valued_at"].tolist() == ["2024-01-05 10:00", "2024-01-06T11:30:00", "2024-01-07 00:00:00"]
+    assert df["amount"].tolist() == [100.0, 250.0, 75.0]
@@ -0,0 +1,26 @@
+"""Tests for the shared JSON helpers."""
+
+import pytest
+
+from app.utils import json_utils
+from app.utils.json_utils import extract_json
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+@pytest.mark.parametrize("text", [
+    '{"chart_type": "bar", "x_column": "region"}',
+    '  {"chart_type": "bar", "x_column": "region"}\n',
+    '```json\n{"chart_type": "bar", "x_column": "region"}\n```',
+    'Here is the plan:\n```\n{"chart_type": "bar", "x_column": "region"}\n```\nDone.',
+])
+def test_extract_json_reads_fenced_and_bare_objects(monkeypatch, text, orjson_available):
+    if orjson_available:
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(json_utils, "ORJSON_AVAILABLE", orjson_available)
+
+    assert extract_json(text) == {"chart_type": "bar", "x_column": "region"}
+
+
+def test_extract_json_rejects_non_json():
+    with pytest.raises(ValueError):
+        extract_json("no chart for you")
@@ -0,0 +1,59 @@
+"""Tests for the mortality table analytics."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+from app.services.mortality_models import compute_life_table, whittaker_henderson
+
+
+def _reference_life_table(qx, radix):
+    """Age-by-age recursion for lx, dx, Lx, Tx and ex."""
+    n = len(qx)
+    lx = np.zeros(n + 1)
+    lx[0] = radix
+    dx = np.zeros(n)
+    for i in range(n):
+        dx[i] = lx[i] * qx[i]
+        lx[i + 1] = lx[i] - dx[i]
+    Lx = np.array([(lx[i] + lx[i + 1]) / 2 for i in range(n)])
+    Tx = np.zeros(n)
+    Tx[n - 1] = Lx[n - 1]
+    for i in range(n - 2, -1, -1):
+        Tx[i] = Tx[i + 1] + Lx[i]
+    ex = np.array([Tx[i] / lx[i] if lx[i] > 0 else 0 for i in range(n)])
+    return {"lx": lx[:n], "dx": dx, "Lx": Lx, "Tx": Tx, "ex": ex}
+
+
+@pytest.mark.parametrize("closed", [False, True])
+def test_compute_life_table_matches_recursion(closed):
+    ages = np.arange(0, 111)
+    qx = np.clip(0.0005 * np.exp(0.085 * ages), 0, 1)
+    if closed:
+        # Nobody survives past the last age but one
+        qx[-2:] = 1.0
+
+    table = compute_life_table(ages, qx, radix=100000)
+    reference = _reference_life_table(qx, 100000)
+
+    np.testing.assert_array_equal(table["age"], ages)
+    np.testing.assert_allclose(table["px"], 1 - qx)
+    for column, expected in reference.items():
+        np.testing.assert_allclose(table[column], expected, rtol=1e-10, atol=1e-9, err_msg=column)
+
+
+@pytest.mark.parametrize("n", [2, 3, 10, 120])
+@pytest.mark.parametrize("order", [1, 2, 3, 4])
+def test_whittaker_henderson_matches_dense_solve(n, order):
+    rng = np.random.default_rng(n * 10 + order)
+    qx = np.clip(0.001 * np.exp(0.08 * np.arange(n)) * rng.uniform(0.8, 1.2, size=n), 0, 1)
+    lambda_param = 100.0
+
+    D = np.eye(n)
+    for _ in range(order):
+        D = np.diff(D, axis=0)
+    A = np.eye(n) + lambda_param * (D.T @ D) + 1e-10 * np.eye(n)
+    expected = np.clip(np.linalg.solve(A, qx), 0, 1)
+
+    np.testing.assert_allclose(whittaker_henderson(qx, order, lambda_param), expected, rtol=1e-8, atol=1e-12)
@@ -0,0 +1,49 @@
+"""Tests for the natural language query service."""
+
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from app.services import nlq_service
+from app.services.nlq_service import NLQService
+
+
+class _RecordingModel:
+    """Gemini model double that records prompts and returns a fixed chart plan."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        plan = {"chart_type": "histogram", "x_column": "claim_amount", "y_column": None}
+        return type("Response", (), {"text": json.dumps(plan)})()
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(nlq_service, "_PLAN_CACHE", nlq_service.OrderedDict())
+    csv_path = tmp_path / "claims.csv"
+    pd.DataFrame({
+        "claim_amount": [100.0, 250.0, 75.0],
+        "policy_region": ["north", "south", "north"],
+    }).to_csv(csv_path, index=False)
+    svc = NLQService(str(csv_path))
+    svc.model = _RecordingModel()
+    return svc
+
+
+def test_short_query_matches_snake_case_column_by_its_words(service):
+    plan = service.interpret_query("claim amount")
+
+    assert len(service.model.prompts) == 1
+    assert plan["x_column"] == "claim_amount"
+
+
+def test_short_query_naming_no_column_skips_gemini(service):
+    service.interpret_query("show me something")
+
+    assert service.model.prompts == []
@@ -0,0 +1,56 @@
+"""Tests for the PDF/Word report generator."""
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, Table
+
+from app.services.report_generator import ReportGenerator
+
+
+def _flowable_texts(story):
+    """Flatten the text of Paragraphs and key-value table cells in a story."""
+    texts = []
+    for flowable in story:
+        if isinstance(flowable, Paragraph):
+            texts.append(flowable.text)
+        elif isinstance(flowable, Table):
+            for row in flowable._cellvalues:
+                texts.extend(cell.text if isinstance(cell, Paragraph) else str(cell) for cell in row)
+    return texts
+
+
+def test_mortality_pdf_lists_age_specific_life_expectancies(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    life_table = [
+        {"age": age, "qx": 0.01, "lx": 100000.0, "dx": 1000.0, "ex": 80.0 - 0.8 * age}
+        for age in range(0, 101)
+    ]
+    generator = ReportGenerator("mortality", {"kpis": {}, "life_table": life_table}, "test")
+
+    story = []
+    generator._add_mortality_details_pdf(story, getSampleStyleSheet())
+    texts = _flowable_texts(story)
+
+    section = texts[texts.index("Age-Specific Life Expectancies"):]
+    for age, ex in [(0, "80.00"), (20, "64.00"), (40, "48.00"), (60, "32.00"), (80, "16.00")]:
+        position = section.index(f"Life Expectancy at Age {age}")
+        assert section[position + 1] == f"{ex} years"
+
+
+def test_word_key_value_table_keeps_spaces_and_section_properties_last(tmp_path, monkeypatch):
+    docx = pytest.importorskip("docx")
+    monkeypatch.chdir(tmp_path)
+    generator = ReportGenerator("survival", {"kpis": {}}, "test")
+    doc = docx.Document()
+    doc.add_paragraph("Summary")
+
+    generator._add_kv_table_word(doc, [["  Indented Key", " x <&> "], ["Median", "5.00"]])
+    doc.add_paragraph("Next section")
+    doc.save(tmp_path / "report.docx")
+
+    reloaded = docx.Document(tmp_path / "report.docx")
+    assert [cell.text for cell in reloaded.tables[0].rows[0].cells] == ["  Indented Key", " x <&> "]
+    assert reloaded.element.body[-1].tag.endswith("}sectPr")
@@ -0,0 +1,75 @@
+"""Tests for the chain-ladder reserving model."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.reserving_chainladder import (
+    compute_development_factors,
+    get_latest_diagonal,
+    project_ultimate,
+)
+
+
+def _reference_development_factors(triangle):
+    """Column-by-column sum-to-sum factors, as computed before vectorization."""
+    factors = []
+    for current, following in zip(triangle.columns[:-1], triangle.columns[1:]):
+        valid = triangle[current].notna() & triangle[following].notna()
+        sum_current = triangle.loc[valid, current].sum()
+        factors.append(1.0 if not valid.any() or sum_current == 0 else float(triangle.loc[valid, following].sum() / sum_current))
+    return factors
+
+
+def _reference_latest(row):
+    """Latest (age, value) of a triangle row, scanning backwards."""
+    for age in range(len(row) - 1, -1, -1):
+        if pd.notna(row.iloc[age]):
+            return age, row.iloc[age]
+    return None, 0.0
+
+
+def _reference_ultimate(triangle, dev_factors):
+    ultimate = pd.Series(index=triangle.index, dtype=float)
+    for idx, row in triangle.iterrows():
+        age, projected = _reference_latest(row)
+        if age is not None:
+            for factor in dev_factors[age:len(row) - 1]:
+                projected *= factor
+        ultimate[idx] = projected
+    return ultimate
+
+
+def _triangles():
+    rng = np.random.default_rng(7)
+    for n in (1, 2, 5, 10):
+        values = np.cumsum(rng.uniform(50, 150, size=(n, n)), axis=1)
+        values[np.add.outer(np.arange(n), np.arange(n)) >= n] = np.nan
+        yield pd.DataFrame(values, index=range(2010, 2010 + n), columns=[f"dev_{k}" for k in range(n)])
+
+    # Ragged rows, an origin with no data and a development period with zero volume
+    ragged = pd.DataFrame(
+        [
+            [100.0, 150.0, 0.0, 0.0, 0.0],
+            [200.0, np.nan, 260.0, 0.0, np.nan],
+            [np.nan, np.nan, np.nan, np.nan, np.nan],
+            [50.0, 80.0, np.nan, np.nan, np.nan],
+            [np.nan, 10.0, np.nan, np.nan, np.nan],
+        ],
+        index=[2016, 2017, 2018, 2019, 2020],
+    )
+    yield ragged
+
+
+@pytest.mark.parametrize("triangle", list(_triangles()))
+def test_chain_ladder_matches_row_by_row_reference(triangle):
+    dev_factors = compute_development_factors(triangle)
+    reference_factors = _reference_development_factors(triangle)
+
+    assert len(dev_factors) == len(reference_factors)
+    np.testing.assert_allclose(dev_factors, reference_factors, rtol=1e-12)
+    pd.testing.assert_series_equal(project_ultimate(triangle, dev_factors), _reference_ultimate(triangle, reference_factors))
+    pd.testing.assert_series_equal(
+        get_latest_diagonal(triangle),
+        pd.Series([_reference_latest(row)[1] for _, row in triangle.iterrows()], index=triangle.index, dtype=float),
+    )
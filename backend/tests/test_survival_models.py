@@ -0,0 +1,43 @@
+"""Tests for the survival analysis models."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("lifelines")
+
+from app.services.survival_models import compute_life_table
+
+
+def _reference_life_table(time, event):
+    """Per-time-point filtering, as computed before the bincount version."""
+    df = pd.DataFrame({"time": time, "event": event})
+    rows = []
+    n_at_risk = len(df)
+    for t in sorted(df["time"].unique()):
+        n_events = len(df[(df["time"] == t) & (df["event"] == 1)])
+        n_censored = len(df[(df["time"] == t) & (df["event"] == 0)])
+        rows.append({"time": float(t), "at_risk": n_at_risk, "observed": n_events, "censored": n_censored})
+        n_at_risk -= n_events + n_censored
+    return rows
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_compute_life_table_matches_filtering_reference(seed):
+    rng = np.random.default_rng(seed)
+    n = 500
+    time = pd.Series(rng.integers(1, 40, size=n).astype(float))
+    event = pd.Series(rng.integers(0, 2, size=n))
+
+    assert compute_life_table(time, event) == _reference_life_table(time, event)
+
+
+def test_compute_life_table_counts_tied_times():
+    time = pd.Series([3.0, 1.0, 3.0, 2.5, 1.0])
+    event = pd.Series([1, 0, 0, 1, 1])
+
+    assert compute_life_table(time, event) == [
+        {"time": 1.0, "at_risk": 5, "observed": 1, "censored": 1},
+        {"time": 2.5, "at_risk": 3, "observed": 1, "censored": 0},
+        {"time": 3.0, "at_risk": 2, "observed": 1, "censored": 1},
+    ]
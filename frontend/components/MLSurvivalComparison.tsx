@@ -7,13 +7,21 @@ interface VariableImportance {
     importance: number;
 }
 
+interface SurvivalPredictions {
+    sample_ids: number[];
+    survival_prob: number[][];
+    actual_time: number[];
+    actual_event: boolean[];
+}
+
 interface ModelResult {
     model_type: string;
     train_c_index?: number;
     test_c_index?: number;
     concordance?: number;
     variable_importance?: VariableImportance[];
-    predictions?: any[];
+    predictions?: SurvivalPredictions;
+    unique_times?: number[];
     error?: string;
 }
 
@@ -57,8 +65,10 @@ const MLSurvivalComparison: React.FC<MLSurvivalComparisonProps> = ({ comparisonD
     const variableImportance = bestMLModel ? models[bestMLModel].variable_importance : null;
 
     // Get predictions from best model for visualization
+    // (survival_prob rows are aligned with the model's unique_times)
+    const timeline = bestMLModel ? models[bestMLModel].unique_times || [] : [];
     const predictions = bestMLModel && models[bestMLModel].predictions
-        ? models[bestMLModel].predictions.slice(0, 5)
+        ? models[bestMLModel].predictions!.survival_prob.slice(0, 5)
         : null;
 
     return (
@@ -213,10 +223,10 @@ const MLSurvivalComparison: React.FC<MLSurvivalComparisonProps> = ({ comparisonD
                                     contentStyle={{ backgroundColor: 'rgba(255, 255, 255, 0.95)', borderRadius: '8px' }}
                                 />
                                 <Legend />
-                                {predictions.map((pred, idx) => {
-                                    const data = pred.timeline.map((t: number, i: number) => ({
+                                {predictions.map((survivalProb, idx) => {
+                                    const data = timeline.map((t: number, i: number) => ({
                                         time: t,
-                                        [`Sample ${idx + 1}`]: pred.survival_prob[i]
+                                        [`Sample ${idx + 1}`]: survivalProb[i]
                                     }));
 
                                     const colors = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6'];